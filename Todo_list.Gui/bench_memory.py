@@ -0,0 +1,58 @@
+"""Measure resident memory per task for large task lists.
+
+Compares the compact Task from todo_core against the previous plain-class
+layout (per-instance __dict__, datetime objects, one category string per
+task). Runs headless:
+
+    python bench_memory.py
+    python bench_memory.py --sizes 100000 1000000
+"""
+import argparse
+import gc
+import tracemalloc
+from datetime import datetime
+
+from bench_tasks import make_tasks
+from todo_core import Priority, Status, Task
+
+
+class PlainTask:
+    """The Task layout before __slots__ and integer timestamps."""
+
+    def __init__(self, id, title, description="", priority=Priority.MEDIUM,
+                 due_date=None, category="General", created_at=None):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.priority = priority
+        self.status = Status.PENDING
+        self.due_date = due_date
+        self.category = category
+        self.created_at = created_at or datetime.now()
+        self.completed_at = None
+
+
+def measure(task_class, count):
+    gc.collect()
+    tracemalloc.start()
+    tasks = make_tasks(count, task_class=task_class, descriptions=False)
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tasks
+    return used / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'tasks':>10} {'plain B/task':>14} {'compact B/task':>16} {'saving':>8}")
+    for count in args.sizes:
+        plain = measure(PlainTask, count)
+        compact = measure(Task, count)
+        print(f"{count:>10} {plain:>14.0f} {compact:>16.0f} {1 - compact / plain:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Compare JSON and binary snapshot load/save speed and file size.
+
+    python bench_storage.py
+    python bench_storage.py --sizes 100000 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from bench_tasks import make_tasks
+from todo_core import Task
+from todo_storage import BinaryStorage, JsonStorage
+
+
+def time_storage(storage, tasks):
+    started = time.perf_counter()
+    storage.save(tasks, len(tasks) + 1)
+    save_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    task_dicts, _ = storage.load()
+    loaded = [Task.from_dict(task_data) for task_data in task_dicts]
+    load_seconds = time.perf_counter() - started
+
+    assert len(loaded) == len(tasks)
+    return save_seconds, load_seconds, os.path.getsize(storage.filename)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000])
+    args = parser.parse_args()
+
+    print(f"{'tasks':>9} {'format':>7} {'save s':>8} {'load s':>8} {'size MB':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for count in args.sizes:
+            tasks = make_tasks(count)
+            for name, storage in (("json", JsonStorage(os.path.join(directory, "tasks.json"))),
+                                  ("binary", BinaryStorage(os.path.join(directory, "tasks.todb")))):
+                save_seconds, load_seconds, size = time_storage(storage, tasks)
+                print(f"{count:>9} {name:>7} {save_seconds:>8.2f} {load_seconds:>8.2f} {size / 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
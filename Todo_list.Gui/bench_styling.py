@@ -0,0 +1,176 @@
+"""Measure the cost of building and restyling task rows.
+
+Compares TaskWidget, styled by the shared TASK_STYLESHEET and dynamic
+properties, against the previous layout that gave every row and child its
+own stylesheet string. Runs without a display:
+
+    python bench_styling.py
+    python bench_styling.py --rows 500 --restyles 10
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import (
+    QApplication, QWidget, QHBoxLayout, QVBoxLayout, QFrame, QLabel, QComboBox, QPushButton
+)
+
+from todo_app import TASK_STYLESHEET, TaskWidget
+from todo_core import Priority, Status, Task
+
+COMBO_STYLE = """
+    QComboBox {
+        background-color: #404040;
+        color: #ffffff;
+        border: 2px solid #555;
+        border-radius: 5px;
+        padding: 5px;
+    }
+    QComboBox::drop-down {
+        border: none;
+    }
+    QComboBox::down-arrow {
+        image: none;
+        border-left: 5px solid transparent;
+        border-right: 5px solid transparent;
+        border-top: 5px solid #ffffff;
+    }
+    QComboBox QAbstractItemView {
+        background-color: #404040;
+        color: #ffffff;
+        selection-background-color: #4CAF50;
+    }
+"""
+
+BUTTON_STYLE = """
+    QPushButton {
+        background-color: #F44336;
+        color: white;
+        border: none;
+        border-radius: 5px;
+        font-size: 16px;
+    }
+    QPushButton:hover {
+        background-color: #D32F2F;
+    }
+"""
+
+CARD_STYLES = {
+    "completed": "QWidget { background-color: #1e4620; border: 2px solid #4CAF50; border-radius: 10px; }",
+    "overdue": "QWidget { background-color: #5a1e1e; border: 2px solid #F44336; border-radius: 10px; }",
+    "normal": "QWidget { background-color: #363636; border: 2px solid #555; border-radius: 10px; }",
+}
+
+PRIORITY_COLORS = {
+    Priority.LOW: "#4CAF50",
+    Priority.MEDIUM: "#FFC107",
+    Priority.HIGH: "#FF9800",
+    Priority.URGENT: "#F44336",
+}
+
+
+class LegacyTaskWidget(TaskWidget):
+    """The TaskWidget layout before the shared stylesheet."""
+
+    def init_ui(self):
+        layout = QHBoxLayout()
+        layout.setContentsMargins(15, 10, 15, 10)
+
+        priority_frame = QFrame()
+        priority_frame.setFixedSize(8, 60)
+        priority_frame.setStyleSheet(f"background-color: {PRIORITY_COLORS[self.task.priority]}; border-radius: 4px;")
+
+        info_layout = QVBoxLayout()
+        title_label = QLabel(self.task.title)
+        title_label.setStyleSheet("font-weight: bold; font-size: 14px; color: #ffffff;")
+        desc_label = QLabel(self.task.description or "No description")
+        desc_label.setStyleSheet("color: #cccccc; font-size: 12px;")
+        desc_label.setWordWrap(True)
+        details_label = QLabel(f"🏷️ {self.task.category}")
+        details_label.setStyleSheet("color: #aaaaaa; font-size: 11px;")
+        info_layout.addWidget(title_label)
+        info_layout.addWidget(desc_label)
+        info_layout.addWidget(details_label)
+
+        status_combo = QComboBox()
+        status_combo.addItems([status.value for status in Status])
+        status_combo.setStyleSheet(COMBO_STYLE)
+
+        delete_btn = QPushButton("🗑️")
+        delete_btn.setFixedSize(40, 40)
+        delete_btn.setStyleSheet(BUTTON_STYLE)
+
+        layout.addWidget(priority_frame)
+        layout.addLayout(info_layout, 1)
+        layout.addWidget(status_combo)
+        layout.addWidget(delete_btn)
+        self.setLayout(layout)
+        self.setFixedHeight(80)
+        self.update_style()
+
+    def update_style(self):
+        if self.task.status == Status.COMPLETED:
+            self.setStyleSheet(CARD_STYLES["completed"])
+        elif self.task.is_overdue():
+            self.setStyleSheet(CARD_STYLES["overdue"])
+        else:
+            self.setStyleSheet(CARD_STYLES["normal"])
+
+
+def build_tasks(count):
+    now = datetime.now()
+    return [Task(i + 1, f"Task {i}", "Some description", Priority(i % 4 + 1),
+                 now + timedelta(days=i % 7 - 3), "Work")
+            for i in range(count)]
+
+
+def measure(widget_class, host, tasks, restyles):
+    start = time.perf_counter()
+    widgets = []
+    for task in tasks:
+        widget = widget_class(task, host)
+        widget.ensurePolished()
+        widgets.append(widget)
+    built = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(restyles):
+        for widget in widgets:
+            widget.task.status = Status.COMPLETED if widget.task.status != Status.COMPLETED else Status.PENDING
+            widget.update_style()
+            widget.ensurePolished()
+    restyled = time.perf_counter() - start
+
+    for widget in widgets:
+        widget.deleteLater()
+    QApplication.processEvents()
+    return built / len(tasks), restyled / (len(tasks) * restyles)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=300)
+    parser.add_argument("--restyles", type=int, default=5)
+    args = parser.parse_args()
+
+    app = QApplication([])
+    legacy_host = QWidget()
+    shared_host = QWidget()
+    shared_host.setStyleSheet(TASK_STYLESHEET)
+
+    results = {
+        "per-widget stylesheets": measure(LegacyTaskWidget, legacy_host, build_tasks(args.rows), args.restyles),
+        "shared stylesheet": measure(TaskWidget, shared_host, build_tasks(args.rows), args.restyles),
+    }
+
+    print(f"{'styling':>24} {'build us/row':>14} {'restyle us/row':>16}")
+    for name, (built, restyled) in results.items():
+        print(f"{name:>24} {built * 1e6:>14.0f} {restyled * 1e6:>16.0f}")
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""Synthetic task sets shared by the benchmarks."""
+from datetime import datetime, timedelta
+
+from todo_core import Priority, Status, Task
+
+CATEGORIES = ["Work", "Personal", "Shopping", "Health", "Learning"]
+
+
+def make_tasks(count, now=datetime(2024, 1, 1), task_class=Task, descriptions=True):
+    """count tasks cycling through every priority, status and category.
+
+    Due dates are spread a month either side of now, so some tasks are
+    overdue and the rest are upcoming. task_class builds each task, so other
+    layouts can be compared with Task; without descriptions every
+    description is empty.
+    """
+    tasks = []
+    for i in range(count):
+        # Fresh strings, the way json.load hands them back
+        category = "".join(CATEGORIES[i % len(CATEGORIES)])
+        task = task_class(i + 1, f"Task {i}", f"Description for task {i}" if descriptions else "",
+                          Priority(i % 4 + 1), now + timedelta(hours=i % 1440 - 720),
+                          category, now - timedelta(seconds=i))
+        if i % 3 == 0:
+            task.status = Status.COMPLETED
+            task.completed_at = now
+        elif i % 3 == 1:
+            task.status = Status.IN_PROGRESS
+        tasks.append(task)
+    return tasks
@@ -0,0 +1,133 @@
+"""Time the TodoList operations the app depends on, at several list sizes.
+
+Generates a synthetic task set for each size, saves it with the chosen
+backend and times loading, saving, single-task mutations and the queries.
+Results are written as JSON so runs from different versions can be
+compared. Runs headless:
+
+    python bench_todo.py
+    python bench_todo.py --sizes 10000 100000 --backend sqlite --output before.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from bench_tasks import CATEGORIES, make_tasks
+from todo_core import Priority, Status, SqliteTodoList, TodoList
+from todo_storage import storage_for
+
+# Data file extension for each backend, as chosen by storage_for
+BACKENDS = {"journal": ".json", "binary": ".todb", "sqlite": ".db"}
+
+
+def open_list(filename):
+    if filename.endswith(".db"):
+        return SqliteTodoList(filename)
+    return TodoList(filename, storage_for(filename), autoload=False)
+
+
+def timed(operation, repeat):
+    """Seconds for each of repeat calls of operation(i)."""
+    samples = []
+    for i in range(repeat):
+        started = time.perf_counter()
+        operation(i)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def summary(samples):
+    return {
+        "calls": len(samples),
+        "mean_s": statistics.fmean(samples),
+        "median_s": statistics.median(samples),
+        "min_s": min(samples),
+        "max_s": max(samples),
+        "ops_per_s": len(samples) / sum(samples) if sum(samples) else None,
+    }
+
+
+def run_size(count, backend, directory, repeat):
+    now = datetime.now()
+    filename = os.path.join(directory, f"tasks_{count}{BACKENDS[backend]}")
+    seed = storage_for(filename)
+    seed.save(make_tasks(count, now), count + 1)
+    seed.close()
+
+    todo_list = open_list(filename)
+    results = {}
+    try:
+        results["load_tasks"] = summary(timed(lambda i: todo_list.load_tasks(), repeat["bulk"]))
+        results["save_tasks"] = summary(timed(lambda i: todo_list.save_tasks(), repeat["bulk"]))
+
+        rng = random.Random(count)
+        ids = [rng.randint(1, count) for _ in range(repeat["point"])]
+        results["get_task"] = summary(timed(lambda i: todo_list.get_task(ids[i]), repeat["point"]))
+        results["update_task"] = summary(timed(
+            lambda i: todo_list.update_task(ids[i], priority=Priority(i % 4 + 1)), repeat["point"]))
+
+        added = []
+        results["add_task"] = summary(timed(
+            lambda i: added.append(todo_list.add_task(f"New task {i}", "", Priority.HIGH,
+                                                      now + timedelta(days=1), "Work")),
+            repeat["point"]))
+        results["delete_task"] = summary(timed(
+            lambda i: todo_list.delete_task(added[i].id), repeat["point"]))
+
+        statuses = list(Status)
+        priorities = list(Priority)
+        results["get_tasks_by_status"] = summary(timed(
+            lambda i: todo_list.get_tasks_by_status(statuses[i % len(statuses)]), repeat["query"]))
+        results["get_tasks_by_priority"] = summary(timed(
+            lambda i: todo_list.get_tasks_by_priority(priorities[i % len(priorities)]), repeat["query"]))
+        results["get_tasks_by_category"] = summary(timed(
+            lambda i: todo_list.get_tasks_by_category(CATEGORIES[i % len(CATEGORIES)]), repeat["query"]))
+        results["get_overdue_tasks"] = summary(timed(lambda i: todo_list.get_overdue_tasks(), repeat["query"]))
+        results["get_statistics"] = summary(timed(lambda i: todo_list.get_statistics(), repeat["query"]))
+    finally:
+        todo_list.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="journal")
+    parser.add_argument("--bulk-repeat", type=int, default=3, help="calls of load_tasks and save_tasks")
+    parser.add_argument("--point-repeat", type=int, default=200, help="calls of get/add/update/delete_task")
+    parser.add_argument("--query-repeat", type=int, default=20, help="calls of each query")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    repeat = {"bulk": args.bulk_repeat, "point": args.point_repeat, "query": args.query_repeat}
+    report = {
+        "benchmark": "todo_list",
+        "backend": args.backend,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "sizes": {},
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for count in args.sizes:
+            print(f"Timing {count} tasks...", file=sys.stderr)
+            report["sizes"][str(count)] = run_size(count, args.backend, directory, repeat)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
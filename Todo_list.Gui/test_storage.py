@@ -0,0 +1,349 @@
+"""Round trips through the task storages, run headless.
+
+    python -m unittest test_storage
+"""
+import errno
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from bench_tasks import make_tasks
+from todo_core import SqliteTodoList, Status, Task, TodoList, convert_data_file, create_todo_list
+from todo_storage import (BinaryStorage, JournalStorage, JsonStorage, SqliteStorage, WriteBehindStorage,
+                          _JsonStream, iter_json_object)
+
+
+def dicts(tasks):
+    return sorted((task.to_dict() for task in tasks), key=lambda data: data['id'])
+
+
+class StorageTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+
+def drain(generator):
+    """(items, return value) of a generator."""
+    items = []
+    while True:
+        try:
+            items.append(next(generator))
+        except StopIteration as done:
+            return items, done.value
+
+
+class SnapshotTest(StorageTestCase):
+    def test_round_trip(self):
+        tasks = make_tasks(50)
+        for storage_class, name in ((JsonStorage, "tasks.json"), (BinaryStorage, "tasks.todb"),
+                                    (SqliteStorage, "tasks.db")):
+            with self.subTest(storage=storage_class.__name__):
+                storage = storage_class(self.path(name))
+                storage.save(tasks, 99)
+                loaded, next_id = storage.load()
+                storage.close()
+                self.assertEqual(next_id, 99)
+                # Storages may hand back dates in their own form
+                self.assertEqual(dicts(Task.from_dict(data) for data in loaded), dicts(tasks))
+
+    def test_convert_journal_only_list(self):
+        # Before the first compaction a new list is only a journal
+        todo_list = create_todo_list(self.path("tasks.json"))
+        for i in range(3):
+            todo_list.add_task(f"Task {i}")
+        todo_list.close()
+        self.assertFalse(os.path.exists(self.path("tasks.json")))
+
+        self.assertEqual(convert_data_file(self.path("tasks.json"), self.path("tasks.todb")), 3)
+        converted = TodoList(self.path("tasks.todb"), BinaryStorage(self.path("tasks.todb")))
+        self.assertEqual([task.title for task in converted.tasks], ["Task 0", "Task 1", "Task 2"])
+
+    def test_convert_missing_file(self):
+        for name in ("missing.json", "missing.db"):
+            with self.subTest(name=name):
+                with self.assertRaises(FileNotFoundError):
+                    convert_data_file(self.path(name), self.path("tasks.todb"))
+                self.assertFalse(os.path.exists(self.path(name)))
+
+
+class StreamTest(StorageTestCase):
+    DOCUMENT = '{"tasks": [12.5, 1e+10, -3, 7.25e-2, true, "a"], "next_id": 42}'
+    VALUES = [12.5, 1e10, -3, 0.0725, True, "a"]
+
+    def test_every_block_size(self):
+        # Numbers cut at a block edge ("12." then "5") must be read whole
+        array = self.DOCUMENT[self.DOCUMENT.index('['):]
+        for block_size in range(1, len(array) + 1):
+            with self.subTest(block_size=block_size):
+                stream = _JsonStream(io.StringIO(array), block_size)
+                stream.expect('[')
+                values = [stream.value()]
+                while stream.expect(',]') == ',':
+                    values.append(stream.value())
+                self.assertEqual(values, self.VALUES)
+
+    def test_iter_json_object(self):
+        items, members = drain(iter_json_object(io.StringIO(self.DOCUMENT), 'tasks'))
+        self.assertEqual(items, self.VALUES)
+        self.assertEqual(members, {'next_id': 42})
+
+    def test_streamed_load_matches_load(self):
+        storage = JsonStorage(self.path("tasks.json"))
+        storage.save(make_tasks(20), 21)
+        self.assertEqual(drain(storage.iter_load()), storage.load())
+
+
+class ShortWrite:
+    """Journal file that writes half of the next short_writes writes, then fails."""
+
+    def __init__(self, f, storage):
+        self.f = f
+        self.storage = storage
+
+    def write(self, data):
+        if self.storage.short_writes:
+            self.storage.short_writes -= 1
+            self.f.write(data[:len(data) // 2])
+            self.f.flush()
+            raise OSError(errno.ENOSPC, "No space left on device")
+        return self.f.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.f, name)
+
+
+class ShortWriteJournal(JournalStorage):
+    short_writes = 0
+
+    def _open_journal(self):
+        return ShortWrite(super()._open_journal(), self)
+
+
+class JournalTest(StorageTestCase):
+    def open_list(self, storage_class=JournalStorage, **kwargs):
+        todo_list = TodoList(self.path("tasks.json"), storage_class(self.path("tasks.json"), **kwargs))
+        self.addCleanup(todo_list.close)
+        return todo_list
+
+    def titles(self):
+        return [task.title for task in self.open_list().tasks]
+
+    def test_replay(self):
+        todo_list = self.open_list()
+        for i in range(5):
+            todo_list.add_task(f"Task {i}")
+        todo_list.update_task(2, status=Status.COMPLETED)
+        todo_list.delete_task(3)
+        todo_list.close()
+        self.assertFalse(os.path.exists(self.path("tasks.json")))
+
+        loaded = self.open_list()
+        self.assertEqual(dicts(loaded.tasks), dicts(todo_list.tasks))
+        self.assertEqual(loaded.next_id, 6)
+
+    def test_compaction(self):
+        todo_list = self.open_list(compact_threshold=1000)
+        for i in range(20):
+            todo_list.add_task(f"Task {i}")
+        todo_list.close()
+        self.assertLess(os.path.getsize(self.path("tasks.json.journal")), 1000)
+        self.assertEqual(len(self.open_list().tasks), 20)
+
+    def test_torn_record(self):
+        todo_list = self.open_list()
+        todo_list.add_task("Kept")
+        todo_list.close()
+        journal = self.path("tasks.json.journal")
+        size = os.path.getsize(journal)
+        with open(journal, 'ab') as f:
+            f.write(b'{"op":"add","task":{"id":2')
+
+        # Loading drops the partial line, so later records stay readable
+        todo_list = self.open_list()
+        self.assertEqual(os.path.getsize(journal), size)
+        todo_list.add_task("After the crash")
+        todo_list.close()
+        self.assertEqual(self.titles(), ["Kept", "After the crash"])
+
+    def test_append_after_unterminated_line(self):
+        todo_list = self.open_list()
+        todo_list.add_task("First")
+        todo_list.close()
+        with open(self.path("tasks.json.journal"), 'ab') as f:
+            f.write(b'{"op":"delete","id":1}')
+
+        # Appending without loading first must not join the two records
+        storage = JournalStorage(self.path("tasks.json"))
+        todo_list = TodoList(self.path("tasks.json"), storage, autoload=False)
+        todo_list.next_id = 3
+        todo_list.add_task("Second")
+        storage.close()
+        self.assertEqual(self.titles(), ["Second"])
+
+    def test_append_after_failed_write(self):
+        todo_list = self.open_list(ShortWriteJournal)
+        todo_list.add_task("A")
+        todo_list.storage.short_writes = 1
+        todo_list.add_task("B")
+        todo_list.add_task("C")
+        todo_list.close()
+        # B's half line is skipped; C, written after it, is kept
+        self.assertEqual(self.titles(), ["A", "C"])
+
+    def test_unreadable_record_in_the_middle(self):
+        todo_list = self.open_list()
+        todo_list.add_task("A")
+        todo_list.close()
+        with open(self.path("tasks.json.journal"), 'ab') as f:
+            f.write(b'{"op":"add","task":{"id":2\n')
+        todo_list = self.open_list()
+        todo_list.next_id = 3
+        todo_list.add_task("C")
+        todo_list.close()
+        self.assertEqual(self.titles(), ["A", "C"])
+
+
+class FailingJournal(JournalStorage):
+    failures = 0
+
+    def append_many(self, records, todo_list):
+        self.calls = getattr(self, 'calls', 0) + 1
+        if self.failures:
+            self.failures -= 1
+            raise OSError("disk full")
+        super().append_many(records, todo_list)
+
+
+class WriteBehindTest(StorageTestCase):
+    def open_list(self, storage):
+        # A long delay, so only flush() writes
+        todo_list = TodoList(self.path("tasks.json"), WriteBehindStorage(storage, delay=60))
+        self.addCleanup(todo_list.close)
+        return todo_list
+
+    def journal_lines(self):
+        with open(self.path("tasks.json.journal"), 'rb') as f:
+            return f.read().count(b"\n")
+
+    def titles(self):
+        return [task.title for task in TodoList(self.path("tasks.json"), JournalStorage(self.path("tasks.json"))).tasks]
+
+    def test_changes_go_to_the_journal(self):
+        journal = FailingJournal(self.path("tasks.json"))
+        todo_list = self.open_list(journal)
+        for i in range(3):
+            todo_list.add_task(f"Task {i}")
+        todo_list.update_task(1, title="Renamed")
+        todo_list.delete_task(2)
+        todo_list.storage.flush()
+        # One write, one line per task
+        self.assertEqual(journal.calls, 1)
+        self.assertEqual(self.journal_lines(), 3)
+        self.assertFalse(os.path.exists(self.path("tasks.json")))
+
+        todo_list.close()
+        self.assertEqual(self.titles(), ["Renamed", "Task 2"])
+        self.assertEqual(TodoList(self.path("tasks.json"), JournalStorage(self.path("tasks.json"))).next_id, 4)
+
+    def test_failed_write_is_retried(self):
+        journal = FailingJournal(self.path("tasks.json"))
+        journal.failures = 1
+        todo_list = self.open_list(journal)
+        todo_list.add_task("Task 0")
+        todo_list.storage.flush()
+        self.assertFalse(os.path.exists(self.path("tasks.json.journal")))
+
+        todo_list.add_task("Task 1")
+        todo_list.storage.flush()
+        self.assertEqual(self.journal_lines(), 2)
+
+    def test_retry_after_write_that_failed_partway(self):
+        journal = ShortWriteJournal(self.path("tasks.json"))
+        todo_list = self.open_list(journal)
+        todo_list.add_task("A")
+        todo_list.storage.flush()
+        journal.short_writes = 1
+        todo_list.add_task("B")
+        todo_list.storage.flush()
+        # The retry and later changes land after the half-written line
+        todo_list.storage.flush()
+        todo_list.add_task("C")
+        todo_list.close()
+        self.assertEqual(self.titles(), ["A", "B", "C"])
+
+
+class LoadingTest(StorageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.filename = self.path("tasks.json")
+        JsonStorage(self.filename).save(make_tasks(10), 11)
+        self.todo_list = TodoList(self.filename, JsonStorage(self.filename), autoload=False)
+        self.todo_list.begin_loading()
+        self.chunks = self.todo_list.read_tasks(chunk_size=4)
+        self.todo_list.add_loaded_tasks(next(self.chunks))
+        self.todo_list.update_task(1, title="Changed while loading")
+
+    def test_writes_wait_for_loading(self):
+        # A save now would drop the six tasks not loaded yet
+        self.assertEqual(len(JsonStorage(self.filename).load()[0]), 10)
+        self.assertTrue(self.todo_list.has_deferred_changes())
+
+        for chunk in self.chunks:
+            self.todo_list.add_loaded_tasks(chunk)
+        self.todo_list.finish_loading(11)
+        tasks, next_id = JsonStorage(self.filename).load()
+        self.assertEqual(len(tasks), 10)
+        self.assertEqual(tasks[0]['title'], "Changed while loading")
+        self.assertEqual(next_id, 11)
+
+    def test_cancelled_load_leaves_the_file(self):
+        self.todo_list.cancel_loading()
+        self.todo_list.close()
+        tasks, _ = JsonStorage(self.filename).load()
+        self.assertEqual(len(tasks), 10)
+        self.assertEqual(tasks[0]['title'], "Task 0")
+
+
+class SqliteStatisticsTest(StorageTestCase):
+    def counted_afresh(self, filename):
+        todo_list = SqliteTodoList(filename)
+        try:
+            return todo_list.get_statistics()
+        finally:
+            todo_list.close()
+
+    def test_counters_follow_changes(self):
+        filename = self.path("tasks.db")
+        todo_list = SqliteTodoList(filename)
+        self.addCleanup(todo_list.close)
+        now = datetime.now()
+        for index in range(6):
+            todo_list.add_task(f"Task {index}", due_date=now + timedelta(days=index - 3, hours=12))
+        todo_list.get_statistics()
+
+        todo_list.update_task(1, status=Status.COMPLETED)
+        todo_list.update_task(5, due_date=now - timedelta(days=1))
+        todo_list.delete_task(2)
+        todo_list.add_task("Late", due_date=now - timedelta(hours=1))
+        statistics = todo_list.get_statistics()
+        statistics['completion_rate'] = round(statistics['completion_rate'], 6)
+        expected = self.counted_afresh(filename)
+        expected['completion_rate'] = round(expected['completion_rate'], 6)
+        self.assertEqual(statistics, expected)
+        self.assertEqual(statistics['overdue'], 3)
+
+        # Tasks falling due later are counted without recounting the table
+        later = now + timedelta(days=2, hours=1)
+        _, _, _, overdue = todo_list.storage.counts(later, Status.COMPLETED.value)
+        self.assertEqual(overdue, todo_list.storage.count_overdue(later, Status.COMPLETED.value))
+
+
+if __name__ == "__main__":
+    unittest.main()
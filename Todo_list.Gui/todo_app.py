@@ -1,207 +1,133 @@
+import queue
 import sys
-import json
-import os
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import CancelledError, ThreadPoolExecutor
 from datetime import datetime
-from enum import Enum
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLineEdit, QTextEdit, QComboBox, QDateEdit, 
-    QLabel, QMessageBox, QScrollArea, QGroupBox, QGridLayout,
-    QProgressBar, QFrame
+    QLabel, QMessageBox, QGroupBox, QGridLayout,
+    QProgressBar, QFrame, QListView, QAbstractItemView, QStyledItemDelegate,
+    QDockWidget, QPlainTextEdit, QCheckBox, QFileDialog
 )
-from PyQt6.QtCore import Qt, QDate, pyqtSignal
-from PyQt6.QtGui import QFont, QPalette, QColor
-
-class Priority(Enum):
-    LOW = 1
-    MEDIUM = 2
-    HIGH = 3
-    URGENT = 4
-
-class Status(Enum):
-    PENDING = "⏳ Pending"
-    IN_PROGRESS = "🔄 In Progress"
-    COMPLETED = "✅ Completed"
-    CANCELLED = "❌ Cancelled"
-
-class Task:
-    def __init__(self, id, title, description="", priority=Priority.MEDIUM, 
-                 due_date=None, category="General", created_at=None):
-        self.id = id
-        self.title = title
-        self.description = description
-        self.priority = priority
-        self.status = Status.PENDING
-        self.due_date = due_date
-        self.category = category
-        self.created_at = created_at or datetime.now()
-        self.completed_at = None
-
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'title': self.title,
-            'description': self.description,
-            'priority': self.priority.value,
-            'status': self.status.value,
-            'due_date': self.due_date.isoformat() if self.due_date else None,
-            'category': self.category,
-            'created_at': self.created_at.isoformat(),
-            'completed_at': self.completed_at.isoformat() if self.completed_at else None
-        }
-
-    @classmethod
-    def from_dict(cls, data):
-        task = cls(
-            data['id'],
-            data['title'],
-            data['description'],
-            Priority(data['priority']),
-            datetime.fromisoformat(data['due_date']) if data['due_date'] else None,
-            data['category'],
-            datetime.fromisoformat(data['created_at'])
-        )
-        task.status = Status(data['status'])
-        task.completed_at = datetime.fromisoformat(data['completed_at']) if data['completed_at'] else None
-        return task
-
-    def is_overdue(self):
-        if self.due_date and self.status != Status.COMPLETED:
-            return self.due_date < datetime.now()
-        return False
-
-class TodoList:
-    def __init__(self, filename="todo_data.json"):
-        self.filename = filename
-        self.tasks = []
-        self.next_id = 1
-        self.load_tasks()
-
-    def load_tasks(self):
-        if os.path.exists(self.filename):
-            try:
-                with open(self.filename, 'r') as f:
-                    data = json.load(f)
-                    self.tasks = [Task.from_dict(task_data) for task_data in data['tasks']]
-                    self.next_id = data['next_id']
-            except Exception as e:
-                print(f"Error loading tasks: {e}")
-                self.tasks = []
-                self.next_id = 1
-
-    def save_tasks(self):
-        try:
-            data = {
-                'tasks': [task.to_dict() for task in self.tasks],
-                'next_id': self.next_id
-            }
-            with open(self.filename, 'w') as f:
-                json.dump(data, f, indent=2)
-            return True
-        except Exception as e:
-            print(f"Error saving tasks: {e}")
-            return False
-
-    def add_task(self, title, description="", priority=Priority.MEDIUM, 
-                 due_date=None, category="General"):
-        task = Task(self.next_id, title, description, priority, due_date, category)
-        self.next_id += 1
-        self.tasks.append(task)
-        if self.save_tasks():
-            return task
-        return None
-
-    def update_task(self, task_id, **kwargs):
-        task = self.get_task(task_id)
-        if task:
-            for key, value in kwargs.items():
-                if hasattr(task, key):
-                    setattr(task, key, value)
-            return self.save_tasks()
-        return False
-
-    def delete_task(self, task_id):
-        task = self.get_task(task_id)
-        if task:
-            self.tasks.remove(task)
-            return self.save_tasks()
-        return False
-
-    def get_task(self, task_id):
-        return next((task for task in self.tasks if task.id == task_id), None)
-
-    def get_tasks_by_status(self, status):
-        return [task for task in self.tasks if task.status == status]
-
-    def get_tasks_by_priority(self, priority):
-        return [task for task in self.tasks if task.priority == priority]
-
-    def get_tasks_by_category(self, category):
-        return [task for task in self.tasks if task.category == category]
-
-    def get_overdue_tasks(self):
-        return [task for task in self.tasks if task.is_overdue()]
+from PyQt6.QtCore import (
+    Qt, QDate, QTimer, QSize, QRect, QModelIndex, QAbstractListModel,
+    pyqtSignal
+)
+from PyQt6.QtGui import QFont, QPalette, QColor, QPainter, QPen, QKeySequence, QShortcut
+from todo_core import Priority, Status, create_todo_list
+from todo_perf import measure, perf
 
-    def get_statistics(self):
-        total = len(self.tasks)
-        completed = len(self.get_tasks_by_status(Status.COMPLETED))
-        pending = len(self.get_tasks_by_status(Status.PENDING))
-        in_progress = len(self.get_tasks_by_status(Status.IN_PROGRESS))
-        overdue = len(self.get_overdue_tasks())
-        
-        completion_rate = (completed / total * 100) if total > 0 else 0
-        
-        priority_stats = {}
-        for priority in Priority:
-            priority_stats[priority] = len(self.get_tasks_by_priority(priority))
-            
-        return {
-            'total': total,
-            'completed': completed,
-            'pending': pending,
-            'in_progress': in_progress,
-            'overdue': overdue,
-            'completion_rate': completion_rate,
-            'priority_stats': priority_stats
-        }
+# Styles for TaskWidget, added once to the main window's stylesheet. Rows
+# pick their look through object names and the dynamic properties set in
+# TaskWidget.update_style, so restyling never parses a stylesheet.
+TASK_STYLESHEET = """
+    TaskWidget {
+        background-color: #363636;
+        border: 2px solid #555;
+        border-radius: 10px;
+    }
+    TaskWidget[overdue="true"] {
+        background-color: #5a1e1e;
+        border: 2px solid #F44336;
+    }
+    TaskWidget[status="COMPLETED"] {
+        background-color: #1e4620;
+        border: 2px solid #4CAF50;
+    }
+    TaskWidget QLabel {
+        background-color: transparent;
+        border: none;
+    }
+    QFrame#taskPriority {
+        border-radius: 4px;
+    }
+    QFrame#taskPriority[priority="LOW"] { background-color: #4CAF50; }
+    QFrame#taskPriority[priority="MEDIUM"] { background-color: #FFC107; }
+    QFrame#taskPriority[priority="HIGH"] { background-color: #FF9800; }
+    QFrame#taskPriority[priority="URGENT"] { background-color: #F44336; }
+    QLabel#taskTitle {
+        font-weight: bold;
+        font-size: 14px;
+        color: #ffffff;
+    }
+    QLabel#taskDescription {
+        color: #cccccc;
+        font-size: 12px;
+    }
+    QLabel#taskDetails {
+        color: #aaaaaa;
+        font-size: 11px;
+    }
+    QComboBox#taskStatus {
+        background-color: #404040;
+        color: #ffffff;
+        border: 2px solid #555;
+        border-radius: 5px;
+        padding: 5px;
+    }
+    QComboBox#taskStatus::drop-down {
+        border: none;
+    }
+    QComboBox#taskStatus::down-arrow {
+        image: none;
+        border-left: 5px solid transparent;
+        border-right: 5px solid transparent;
+        border-top: 5px solid #ffffff;
+    }
+    QComboBox#taskStatus QAbstractItemView {
+        background-color: #404040;
+        color: #ffffff;
+        selection-background-color: #4CAF50;
+    }
+    QPushButton#taskDelete {
+        background-color: #F44336;
+        color: white;
+        border: none;
+        border-radius: 5px;
+        font-size: 16px;
+    }
+    QPushButton#taskDelete:hover {
+        background-color: #D32F2F;
+    }
+"""
 
 class TaskWidget(QWidget):
-    taskUpdated = pyqtSignal()
+    taskUpdated = pyqtSignal(object)
     taskDeleted = pyqtSignal(int)
 
+    @measure("TaskWidget.__init__")
     def __init__(self, task, parent=None):
         super().__init__(parent)
         self.task = task
         self.init_ui()
 
     def init_ui(self):
+        # Paint the card background from the stylesheet
+        self.setAttribute(Qt.WidgetAttribute.WA_StyledBackground, True)
         layout = QHBoxLayout()
         layout.setContentsMargins(15, 10, 15, 10)
         
         # Priority indicator dengan warna
-        priority_colors = {
-            Priority.LOW: "#4CAF50",      # Green
-            Priority.MEDIUM: "#FFC107",   # Yellow
-            Priority.HIGH: "#FF9800",     # Orange
-            Priority.URGENT: "#F44336"    # Red
-        }
-        
         priority_frame = QFrame()
+        priority_frame.setObjectName("taskPriority")
+        priority_frame.setProperty("priority", self.task.priority.name)
         priority_frame.setFixedSize(8, 60)
-        priority_frame.setStyleSheet(f"background-color: {priority_colors[self.task.priority]}; border-radius: 4px;")
         
         # Task info
         info_layout = QVBoxLayout()
         
         title_label = QLabel(self.task.title)
-        title_label.setStyleSheet("font-weight: bold; font-size: 14px; color: #ffffff;")
+        title_label.setObjectName("taskTitle")
         
         desc_label = QLabel(self.task.description if self.task.description else "No description")
-        desc_label.setStyleSheet("color: #cccccc; font-size: 12px;")
+        desc_label.setObjectName("taskDescription")
         desc_label.setWordWrap(True)
         
         details_label = QLabel(f"🏷️ {self.task.category} | 📅 {self.task.due_date.strftime('%Y-%m-%d') if self.task.due_date else 'No due date'}")
-        details_label.setStyleSheet("color: #aaaaaa; font-size: 11px;")
+        details_label.setObjectName("taskDetails")
         
         info_layout.addWidget(title_label)
         info_layout.addWidget(desc_label)
@@ -210,52 +136,19 @@ class TaskWidget(QWidget):
         
         # Status combo
         status_combo = QComboBox()
+        status_combo.setObjectName("taskStatus")
         status_combo.addItems([status.value for status in Status])
         status_combo.setCurrentText(self.task.status.value)
         status_combo.currentTextChanged.connect(self.update_status)
         status_combo.setFixedWidth(150)
-        status_combo.setStyleSheet("""
-            QComboBox {
-                background-color: #404040;
-                color: #ffffff;
-                border: 2px solid #555;
-                border-radius: 5px;
-                padding: 5px;
-            }
-            QComboBox::drop-down {
-                border: none;
-            }
-            QComboBox::down-arrow {
-                image: none;
-                border-left: 5px solid transparent;
-                border-right: 5px solid transparent;
-                border-top: 5px solid #ffffff;
-            }
-            QComboBox QAbstractItemView {
-                background-color: #404040;
-                color: #ffffff;
-                selection-background-color: #4CAF50;
-            }
-        """)
         
         # Action buttons
         button_layout = QHBoxLayout()
         
         delete_btn = QPushButton("🗑️")
+        delete_btn.setObjectName("taskDelete")
         delete_btn.setToolTip("Delete Task")
         delete_btn.setFixedSize(40, 40)
-        delete_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #F44336;
-                color: white;
-                border: none;
-                border-radius: 5px;
-                font-size: 16px;
-            }
-            QPushButton:hover {
-                background-color: #D32F2F;
-            }
-        """)
         delete_btn.clicked.connect(self.delete_task)
         
         button_layout.addWidget(status_combo)
@@ -278,34 +171,20 @@ class TaskWidget(QWidget):
         else:
             self.task.completed_at = None
             
-        self.taskUpdated.emit()
+        self.taskUpdated.emit(self.task)
         self.update_style()
 
     def update_style(self):
-        if self.task.status == Status.COMPLETED:
-            self.setStyleSheet("""
-                QWidget {
-                    background-color: #1e4620;
-                    border: 2px solid #4CAF50;
-                    border-radius: 10px;
-                }
-            """)
-        elif self.task.is_overdue():
-            self.setStyleSheet("""
-                QWidget {
-                    background-color: #5a1e1e;
-                    border: 2px solid #F44336;
-                    border-radius: 10px;
-                }
-            """)
-        else:
-            self.setStyleSheet("""
-                QWidget {
-                    background-color: #363636;
-                    border: 2px solid #555;
-                    border-radius: 10px;
-                }
-            """)
+        status = self.task.status.name
+        overdue = self.task.is_overdue()
+        if self.property("status") == status and self.property("overdue") == overdue:
+            return
+        self.setProperty("status", status)
+        self.setProperty("overdue", overdue)
+        # Qt only re-reads dynamic properties when the widget is polished
+        # again; only this widget's own rules depend on them.
+        self.style().unpolish(self)
+        self.style().polish(self)
 
     def delete_task(self):
         reply = QMessageBox.question(self, "Delete Task", 
@@ -314,12 +193,316 @@ class TaskWidget(QWidget):
         if reply == QMessageBox.StandardButton.Yes:
             self.taskDeleted.emit(self.task.id)
 
+# Status filter entries other than "All Tasks"; Overdue is handled apart
+STATUS_FILTERS = {
+    "⏳ Pending": Status.PENDING,
+    "🔄 In Progress": Status.IN_PROGRESS,
+    "✅ Completed": Status.COMPLETED,
+}
+OVERDUE_FILTER = "⚠️ Overdue"
+
+def status_predicate(filter_text):
+    """Test for a single task matching the status filter, or None for all."""
+    if filter_text == OVERDUE_FILTER:
+        return lambda task: task.is_overdue()
+    status = STATUS_FILTERS.get(filter_text)
+    if status is None:
+        return None
+    return lambda task: task.status == status
+
+class TaskListModel(QAbstractListModel):
+    """Tasks for the task view, kept sorted by id.
+
+    The model holds every loaded task and shows the ones that pass the
+    current filter. Changes are applied row by row (insert, remove,
+    dataChanged), so the view keeps its scroll position and selection.
+    """
+
+    TaskRole = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._all = {}
+        # Visible rows
+        self._tasks = []
+        self._ids = []
+        self._search_text = ""
+        self._predicate = None
+        # Ids changed while a filter is being computed elsewhere
+        self._dirty = None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._tasks)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        task = self._tasks[index.row()]
+        if role == self.TaskRole:
+            return task
+        if role == Qt.ItemDataRole.DisplayRole:
+            return task.title
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return task.description or None
+        return None
+
+    def _row_of(self, task_id):
+        row = bisect_left(self._ids, task_id)
+        if row < len(self._ids) and self._ids[row] == task_id:
+            return row
+        return None
+
+    def _matches(self, task):
+        if self._search_text and not (self._search_text in task.title.lower() or
+                                      self._search_text in task.description.lower()):
+            return False
+        return self._predicate is None or self._predicate(task)
+
+    def _filtering(self):
+        return bool(self._search_text) or self._predicate is not None
+
+    def begin_filter(self):
+        """Start recording changes until the next set_filter call.
+
+        The matching ids are computed on a worker thread; tasks that change
+        in the meantime are checked again when the result is applied.
+        """
+        self._dirty = set()
+
+    def set_filter(self, search_text, predicate, ids=None):
+        """Show the tasks matching search_text and predicate, in one reset.
+
+        ids is the sorted list of matching task ids, looked up from the
+        list's indexes; None means every task matches. Tasks added or
+        changed later are checked one at a time with _matches.
+        """
+        self._search_text = search_text.lower()
+        self._predicate = predicate
+        if ids is None:
+            ids = sorted(self._all)
+        else:
+            ids = [task_id for task_id in ids if task_id in self._all]
+        dirty, self._dirty = self._dirty, None
+        if dirty:
+            visible = set(ids)
+            for task_id in dirty:
+                task = self._all.get(task_id)
+                if task is not None and self._matches(task):
+                    visible.add(task_id)
+                else:
+                    visible.discard(task_id)
+            ids = sorted(visible)
+        self.beginResetModel()
+        self._ids = ids
+        self._tasks = [self._all[task_id] for task_id in ids]
+        self.endResetModel()
+
+    def append_tasks(self, tasks):
+        """Add a batch of tasks, in one insert when they follow the last row."""
+        for task in tasks:
+            self._all[task.id] = task
+        if self._dirty is not None:
+            # The pending filter result was computed without them
+            self._dirty.update(task.id for task in tasks)
+        if self._filtering():
+            tasks = [task for task in tasks if self._matches(task)]
+        if not tasks:
+            return
+        in_order = all(a.id < b.id for a, b in zip(tasks, tasks[1:]))
+        if not in_order or (self._ids and tasks[0].id <= self._ids[-1]):
+            for task in tasks:
+                self._show(task)
+            return
+        first = len(self._tasks)
+        self.beginInsertRows(QModelIndex(), first, first + len(tasks) - 1)
+        self._tasks.extend(tasks)
+        self._ids.extend(task.id for task in tasks)
+        self.endInsertRows()
+
+    def insert_task(self, task):
+        self.task_changed(task)
+
+    def remove_task(self, task_id):
+        self._all.pop(task_id, None)
+        if self._dirty is not None:
+            self._dirty.add(task_id)
+        self._hide(task_id)
+
+    def task_changed(self, task):
+        """Add, repaint or drop the task's row depending on the filter."""
+        self._all[task.id] = task
+        if self._dirty is not None:
+            self._dirty.add(task.id)
+        if self._matches(task):
+            self._show(task)
+        else:
+            self._hide(task.id)
+
+    def _show(self, task):
+        row = bisect_left(self._ids, task.id)
+        if row < len(self._ids) and self._ids[row] == task.id:
+            # Backends without shared objects hand out fresh copies
+            self._tasks[row] = task
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+            return
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._tasks.insert(row, task)
+        self._ids.insert(row, task.id)
+        self.endInsertRows()
+
+    def _hide(self, task_id):
+        row = self._row_of(task_id)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._tasks[row]
+        del self._ids[row]
+        self.endRemoveRows()
+
+    def sync_tasks(self, tasks):
+        """Match the model to tasks with row-level changes only."""
+        self._all = {task.id: task for task in tasks}
+        visible = {task.id: task for task in tasks if self._matches(task)}
+        for row in reversed(range(len(self._ids))):
+            if self._ids[row] not in visible:
+                self._hide(self._ids[row])
+        for row, task_id in enumerate(self._ids):
+            self._tasks[row] = visible.pop(task_id)
+        if self._tasks:
+            self.dataChanged.emit(self.index(0), self.index(len(self._tasks) - 1))
+        for task in sorted(visible.values(), key=lambda task: task.id):
+            self._show(task)
+
+class TaskDelegate(QStyledItemDelegate):
+    """Paints task rows the way TaskWidget draws them.
+
+    Only visible rows are ever painted, so the list costs the same with a
+    hundred tasks or a hundred thousand. The current row gets a real
+    TaskWidget on top for editing.
+    """
+
+    ROW_HEIGHT = 80
+    ROW_SPACING = 10
+
+    PRIORITY_COLORS = {
+        Priority.LOW: QColor("#4CAF50"),
+        Priority.MEDIUM: QColor("#FFC107"),
+        Priority.HIGH: QColor("#FF9800"),
+        Priority.URGENT: QColor("#F44336")
+    }
+    # (background, border) for completed, overdue and other rows
+    COMPLETED_COLORS = (QColor("#1e4620"), QColor("#4CAF50"))
+    OVERDUE_COLORS = (QColor("#5a1e1e"), QColor("#F44336"))
+    NORMAL_COLORS = (QColor("#363636"), QColor("#555555"))
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.title_font = QFont()
+        self.title_font.setPixelSize(14)
+        self.title_font.setBold(True)
+        self.desc_font = QFont()
+        self.desc_font.setPixelSize(12)
+        self.details_font = QFont()
+        self.details_font.setPixelSize(11)
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.ROW_HEIGHT + self.ROW_SPACING)
+
+    def paint(self, painter, option, index):
+        task = index.data(TaskListModel.TaskRole)
+        if task is None:
+            return
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        rect = QRect(option.rect.left() + 1, option.rect.top() + 1,
+                     option.rect.width() - 2, self.ROW_HEIGHT - 2)
+
+        if task.status == Status.COMPLETED:
+            background, border = self.COMPLETED_COLORS
+        elif task.is_overdue():
+            background, border = self.OVERDUE_COLORS
+        else:
+            background, border = self.NORMAL_COLORS
+        painter.setPen(QPen(border, 2))
+        painter.setBrush(background)
+        painter.drawRoundedRect(rect, 10, 10)
+
+        # Priority indicator
+        bar = QRect(rect.left() + 15, rect.top() + (rect.height() - 60) // 2, 8, 60)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(self.PRIORITY_COLORS[task.priority])
+        painter.drawRoundedRect(bar, 4, 4)
+
+        # Status box and delete button, as placeholders for the editor
+        center_y = rect.top() + rect.height() // 2
+        delete_rect = QRect(rect.right() - 15 - 40, center_y - 20, 40, 40)
+        status_rect = QRect(delete_rect.left() - 6 - 150, center_y - 15, 150, 30)
+        painter.setPen(QPen(QColor("#555555"), 2))
+        painter.setBrush(QColor("#404040"))
+        painter.drawRoundedRect(status_rect, 5, 5)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor("#F44336"))
+        painter.drawRoundedRect(delete_rect, 5, 5)
+        painter.setPen(QColor("#ffffff"))
+        painter.setFont(self.desc_font)
+        painter.drawText(status_rect.adjusted(8, 0, -8, 0),
+                         Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, task.status.value)
+        painter.drawText(delete_rect, Qt.AlignmentFlag.AlignCenter, "🗑️")
+
+        # Task info
+        left = bar.right() + 12
+        width = status_rect.left() - 12 - left
+        due_text = task.due_date.strftime('%Y-%m-%d') if task.due_date else 'No due date'
+        lines = [
+            (self.title_font, QColor("#ffffff"), task.title),
+            (self.desc_font, QColor("#cccccc"), task.description if task.description else "No description"),
+            (self.details_font, QColor("#aaaaaa"), f"🏷️ {task.category} | 📅 {due_text}")
+        ]
+        y = rect.top() + 10
+        for font, color, text in lines:
+            painter.setFont(font)
+            painter.setPen(color)
+            metrics = painter.fontMetrics()
+            text = metrics.elidedText(text.replace("\n", " "), Qt.TextElideMode.ElideRight, width)
+            painter.drawText(QRect(left, y, width, metrics.height()),
+                             Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, text)
+            y += metrics.height() + 4
+
+        painter.restore()
+
 class MainWindow(QMainWindow):
-    def __init__(self):
+    # (generation, (search_text, predicate, ids)) from the filter thread
+    filterReady = pyqtSignal(int, object)
+    # Time spent adding loaded chunks per timer tick, and the wait between
+    # ticks when the loader has nothing new
+    LOAD_BUDGET = 0.008
+    LOAD_POLL_MS = 10
+
+    def __init__(self, filename="todo_data.json"):
         super().__init__()
-        self.todo_list = TodoList()
+        self.todo_list = create_todo_list(filename, autoload=False)
+        self.todo_list.add_listener(self.on_task_list_changed)
+        # One timer for the whole list, armed for the next due date
+        self.overdue_timer = QTimer(self)
+        self.overdue_timer.setSingleShot(True)
+        self.overdue_timer.timeout.connect(self.on_overdue_timer)
+        # Debounce the search box so typing a word runs one search
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150)
+        self.search_timer.timeout.connect(self.filter_tasks)
+        # Matching ids are computed off the GUI thread; each new query bumps
+        # the generation and cancels the one still running.
+        self.filter_executor = ThreadPoolExecutor(max_workers=1)
+        self.filter_generation = 0
+        self.filter_future = None
+        self.filter_cancelled = threading.Event()
+        self.filterReady.connect(self.apply_filter)
+        self.load_thread = None
         self.init_ui()
-        self.load_tasks()
+        self.start_loading()
 
     def init_ui(self):
         self.setWindowTitle("🚀 Professional Todo List - Portfolio Edition")
@@ -470,7 +653,7 @@ class MainWindow(QMainWindow):
                 padding: 8px 15px;
                 border-radius: 5px;
             }
-        """)
+        """ + TASK_STYLESHEET)
         
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -514,15 +697,15 @@ class MainWindow(QMainWindow):
         form_layout.addWidget(QLabel("Due Date:"), 2, 0)
         form_layout.addWidget(self.due_date, 2, 1)
         
-        add_btn = QPushButton("🎯 Add Task")
-        add_btn.clicked.connect(self.add_task)
+        self.add_btn = QPushButton("🎯 Add Task")
+        self.add_btn.clicked.connect(self.add_task)
         
         add_task_layout.addWidget(QLabel("Title:"))
         add_task_layout.addWidget(self.title_input)
         add_task_layout.addWidget(QLabel("Description:"))
         add_task_layout.addWidget(self.desc_input)
         add_task_layout.addLayout(form_layout)
-        add_task_layout.addWidget(add_btn)
+        add_task_layout.addWidget(self.add_btn)
         
         add_task_group.setLayout(add_task_layout)
         
@@ -553,10 +736,11 @@ class MainWindow(QMainWindow):
         
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("🔍 Search tasks...")
-        self.search_input.textChanged.connect(self.filter_tasks)
+        self.search_input.textChanged.connect(self.search_timer.start)
         
         self.filter_combo = QComboBox()
         self.filter_combo.addItems(["All Tasks", "⏳ Pending", "🔄 In Progress", "✅ Completed", "⚠️ Overdue"])
+        self.filter_combo.currentTextChanged.connect(self.filter_tasks)
         
         clear_btn = QPushButton("🔄 Refresh")
         clear_btn.setObjectName("secondary")
@@ -566,28 +750,106 @@ class MainWindow(QMainWindow):
         filter_layout.addWidget(self.filter_combo)
         filter_layout.addWidget(clear_btn)
         
-        # Task list
-        self.task_scroll = QScrollArea()
-        self.task_scroll.setStyleSheet("background-color: #1e1e1e; border: none;")
-        self.task_widget = QWidget()
-        self.task_widget.setStyleSheet("background-color: #1e1e1e;")
-        self.task_layout = QVBoxLayout()
-        self.task_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-        self.task_layout.setSpacing(10)
-        self.task_widget.setLayout(self.task_layout)
-        self.task_scroll.setWidget(self.task_widget)
-        self.task_scroll.setWidgetResizable(True)
+        # Task list: rows are painted by TaskDelegate, only the current
+        # row gets a TaskWidget
+        self.task_model = TaskListModel(self)
+        self.task_view = QListView()
+        self.task_view.setStyleSheet("background-color: #1e1e1e; border: none;")
+        self.task_view.setModel(self.task_model)
+        self.task_view.setItemDelegate(TaskDelegate(self.task_view))
+        self.task_view.setUniformItemSizes(True)
+        self.task_view.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.task_view.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.task_view.selectionModel().currentChanged.connect(self.on_current_task_changed)
+        
+        # Shown while tasks stream in at startup
+        self.loading_label = QLabel("⏳ Loading tasks...")
+        self.loading_bar = QProgressBar()
+        self.loading_bar.setRange(0, 0)
+        self.loading_bar.setTextVisible(False)
+        self.loading_bar.setFixedHeight(8)
         
         right_side.addLayout(filter_layout)
         right_side.addWidget(QLabel("📋 Your Tasks:"))
-        right_side.addWidget(self.task_scroll)
+        right_side.addWidget(self.loading_label)
+        right_side.addWidget(self.loading_bar)
+        right_side.addWidget(self.task_view)
         
         # Add to main layout
         main_layout.addLayout(left_sidebar, 1)
         main_layout.addLayout(right_side, 2)
         
+        self.init_perf_dock()
         self.update_statistics()
 
+    def init_perf_dock(self):
+        """Dock with the hot-path timings from todo_perf, toggled with F12."""
+        self.perf_dock = QDockWidget("⏱️ Performance", self)
+        self.perf_dock.setObjectName("perfDock")
+        
+        perf_widget = QWidget()
+        perf_layout = QVBoxLayout()
+        perf_widget.setLayout(perf_layout)
+        
+        self.perf_text = QPlainTextEdit()
+        self.perf_text.setReadOnly(True)
+        self.perf_text.setFont(QFont("Consolas", 9))
+        
+        perf_buttons = QHBoxLayout()
+        record_check = QCheckBox("Record")
+        record_check.setChecked(perf.enabled)
+        record_check.toggled.connect(self.set_perf_recording)
+        reset_btn = QPushButton("Reset")
+        reset_btn.setObjectName("secondary")
+        reset_btn.clicked.connect(self.reset_perf)
+        export_btn = QPushButton("Export...")
+        export_btn.setObjectName("secondary")
+        export_btn.clicked.connect(self.export_perf)
+        perf_buttons.addWidget(record_check)
+        perf_buttons.addWidget(reset_btn)
+        perf_buttons.addWidget(export_btn)
+        
+        perf_layout.addLayout(perf_buttons)
+        perf_layout.addWidget(self.perf_text)
+        self.perf_dock.setWidget(perf_widget)
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.perf_dock)
+        self.perf_dock.setVisible(False)
+        
+        # Refreshed only while the dock is open
+        self.perf_timer = QTimer(self)
+        self.perf_timer.setInterval(1000)
+        self.perf_timer.timeout.connect(self.refresh_perf)
+        self.perf_dock.visibilityChanged.connect(self.on_perf_dock_visibility)
+        QShortcut(QKeySequence("F12"), self, self.toggle_perf_dock)
+
+    def toggle_perf_dock(self):
+        self.perf_dock.setVisible(not self.perf_dock.isVisible())
+
+    def on_perf_dock_visibility(self, visible):
+        if visible:
+            self.refresh_perf()
+            self.perf_timer.start()
+        else:
+            self.perf_timer.stop()
+
+    def set_perf_recording(self, enabled):
+        perf.enabled = enabled
+
+    def reset_perf(self):
+        perf.reset()
+        self.refresh_perf()
+
+    def refresh_perf(self):
+        self.perf_text.setPlainText(perf.report())
+
+    def export_perf(self):
+        filename, _ = QFileDialog.getSaveFileName(self, "Export Timings", "todo_perf.json", "JSON (*.json)")
+        if filename:
+            try:
+                perf.export(filename)
+            except OSError as e:
+                QMessageBox.critical(self, "Error", f"Failed to export timings: {e}")
+
     def set_dark_palette(self):
         """Set dark palette for the entire application"""
         dark_palette = QPalette()
@@ -607,6 +869,20 @@ class MainWindow(QMainWindow):
         
         QApplication.setPalette(dark_palette)
 
+    def closeEvent(self, event):
+        if self.load_thread is not None:
+            self.load_timer.stop()
+            # Edits made while loading are written once every task is in;
+            # without any, the rest of the file needn't be read
+            if not self.todo_list.has_deferred_changes():
+                self.load_cancelled.set()
+            self.load_thread.join()
+            self.drain_loaded_chunks()
+        self.filter_cancelled.set()
+        self.filter_executor.shutdown(wait=True, cancel_futures=True)
+        self.todo_list.close()
+        super().closeEvent(event)
+
     def add_task(self):
         title = self.title_input.text().strip()
         if not title:
@@ -616,11 +892,11 @@ class MainWindow(QMainWindow):
         description = self.desc_input.toPlainText().strip()
         priority = Priority(self.priority_combo.currentIndex() + 1)
         category = self.category_combo.currentText().replace("💼 ", "").replace("🏠 ", "").replace("🛒 ", "").replace("❤️ ", "").replace("📚 ", "")
-        due_date = self.due_date.date().toPyDate()
+        # Store a datetime so due dates compare against datetime.now()
+        due_date = datetime.combine(self.due_date.date().toPyDate(), datetime.min.time())
         
         task = self.todo_list.add_task(title, description, priority, due_date, category)
         if task:
-            self.add_task_to_ui(task)
             self.clear_inputs()
             self.update_statistics()
             QMessageBox.information(self, "Success", "Task added successfully! 🎉")
@@ -633,59 +909,187 @@ class MainWindow(QMainWindow):
         self.priority_combo.setCurrentIndex(1)  # Medium
         self.due_date.setDate(QDate.currentDate().addDays(7))
 
+    @measure("MainWindow.add_task_to_ui")
     def add_task_to_ui(self, task):
-        task_widget = TaskWidget(task)
-        task_widget.taskUpdated.connect(self.on_task_updated)
-        task_widget.taskDeleted.connect(self.delete_task)
-        self.task_layout.addWidget(task_widget)
+        self.task_model.insert_task(task)
 
-    def load_tasks(self):
-        # Clear existing tasks
-        for i in reversed(range(self.task_layout.count())): 
-            widget = self.task_layout.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
-            
-        # Add all tasks
-        for task in self.todo_list.tasks:
+    def on_task_list_changed(self, event, task):
+        if event == 'added':
             self.add_task_to_ui(task)
-            
+        elif event == 'removed':
+            self.task_model.remove_task(task.id)
+        else:
+            self.task_model.task_changed(task)
+
+    def on_current_task_changed(self, current, previous):
+        if previous.isValid():
+            self.task_view.setIndexWidget(previous, None)
+        if current.isValid():
+            task_widget = TaskWidget(current.data(TaskListModel.TaskRole))
+            task_widget.taskUpdated.connect(self.on_task_updated)
+            task_widget.taskDeleted.connect(self.delete_task)
+            self.task_view.setIndexWidget(current, task_widget)
+
+    def current_task_widget(self):
+        return self.task_view.indexWidget(self.task_view.currentIndex())
+
+    def start_loading(self):
+        # The data file is parsed on a loader thread after the window is
+        # shown; parsed chunks are queued and added to the list and the view
+        # by load_timer, a few milliseconds per event-loop pass. New tasks
+        # wait until next_id is known; edits to tasks already shown are held
+        # back by the list until the rest is in.
+        self.add_btn.setEnabled(False)
+        self.todo_list.begin_loading()
+        self.loaded_count = 0
+        self.load_queue = queue.SimpleQueue()
+        self.load_cancelled = threading.Event()
+        self.load_thread = threading.Thread(target=self.load_worker, daemon=True)
+        self.load_timer = QTimer(self)
+        self.load_timer.timeout.connect(self.insert_loaded_chunks)
+        self.load_thread.start()
+        self.load_timer.start(self.LOAD_POLL_MS)
+
+    def load_worker(self):
+        """Loader thread: queue ('chunk', tasks) items, then ('done', next_id).
+
+        next_id is None when loading failed or was cancelled.
+        """
+        next_id = None
+        try:
+            chunks = self.todo_list.read_tasks()
+            while not self.load_cancelled.is_set():
+                try:
+                    self.load_queue.put(('chunk', next(chunks)))
+                except StopIteration as done:
+                    next_id = done.value
+                    break
+        except Exception as e:
+            print(f"Error loading tasks: {e}")
+        self.load_queue.put(('done', next_id))
+
+    @measure("MainWindow.insert_loaded_chunks")
+    def insert_loaded_chunks(self):
+        deadline = time.perf_counter() + self.LOAD_BUDGET
+        while time.perf_counter() < deadline:
+            try:
+                kind, chunk = self.load_queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'done':
+                self.end_loading(chunk)
+                self.finish_loading()
+                return
+            self.todo_list.add_loaded_tasks(chunk)
+            self.task_model.append_tasks(chunk)
+            self.loaded_count += len(chunk)
+        self.loading_label.setText(f"⏳ Loading tasks... {self.loaded_count:,}")
+        # Come straight back while chunks are waiting
+        self.load_timer.setInterval(0 if not self.load_queue.empty() else self.LOAD_POLL_MS)
+
+    def drain_loaded_chunks(self):
+        """Add what the finished loader queued to the list only, skipping the view."""
+        while True:
+            kind, chunk = self.load_queue.get()
+            if kind == 'done':
+                self.end_loading(chunk)
+                return
+            self.todo_list.add_loaded_tasks(chunk)
+
+    def end_loading(self, next_id):
+        if next_id is None:
+            self.todo_list.cancel_loading()
+        else:
+            self.todo_list.finish_loading(next_id)
+
+    def finish_loading(self):
+        self.load_timer.stop()
+        self.load_thread.join()
+        self.load_thread = None
+        self.loading_label.setVisible(False)
+        self.loading_bar.setVisible(False)
+        self.add_btn.setEnabled(True)
         self.update_statistics()
 
-    def on_task_updated(self):
-        self.todo_list.save_tasks()
+    @measure("MainWindow.load_tasks")
+    def load_tasks(self):
+        self.task_model.sync_tasks(self.todo_list.tasks)
+        self.update_statistics()
+
+    def on_task_updated(self, task):
+        self.todo_list.save_task(task)
         self.update_statistics()
 
     def delete_task(self, task_id):
         if self.todo_list.delete_task(task_id):
-            self.load_tasks()
+            self.update_statistics()
             QMessageBox.information(self, "Success", "Task deleted successfully!")
         else:
             QMessageBox.critical(self, "Error", "Failed to delete task!")
 
+    @measure("MainWindow.filter_tasks")
     def filter_tasks(self):
-        search_text = self.search_input.text().lower()
+        self.search_timer.stop()
+        self.filter_cancelled.set()
+        if self.filter_future is not None:
+            self.filter_future.cancel()
+        self.filter_generation += 1
+        self.filter_cancelled = threading.Event()
+
+        search_text = self.search_input.text()
         filter_text = self.filter_combo.currentText()
-        
-        for i in range(self.task_layout.count()):
-            widget = self.task_layout.itemAt(i).widget()
-            if widget:
-                task = widget.task
-                matches_search = (search_text in task.title.lower() or 
-                                search_text in task.description.lower())
-                
-                matches_filter = True
-                if filter_text == "⏳ Pending":
-                    matches_filter = task.status == Status.PENDING
-                elif filter_text == "🔄 In Progress":
-                    matches_filter = task.status == Status.IN_PROGRESS
-                elif filter_text == "✅ Completed":
-                    matches_filter = task.status == Status.COMPLETED
-                elif filter_text == "⚠️ Overdue":
-                    matches_filter = task.is_overdue()
-                
-                widget.setVisible(matches_search and matches_filter)
+        # Bucket lookups stay here: they are cheap, and promoting overdue
+        # tasks notifies the model.
+        if filter_text == OVERDUE_FILTER:
+            status_tasks = self.todo_list.get_overdue_tasks()
+        elif filter_text in STATUS_FILTERS:
+            status_tasks = self.todo_list.get_tasks_by_status(STATUS_FILTERS[filter_text])
+        else:
+            status_tasks = None
+
+        self.task_model.begin_filter()
+        self.filter_future = self.filter_executor.submit(
+            self.matching_ids, search_text, status_tasks, self.filter_cancelled)
+        self.filter_future.add_done_callback(
+            lambda future, generation=self.filter_generation, predicate=status_predicate(filter_text):
+                self.on_filter_done(future, generation, search_text, predicate))
+
+    @measure("MainWindow.matching_ids")
+    def matching_ids(self, search_text, status_tasks, cancelled):
+        """Sorted ids passing both filters, or None for all. Runs on the filter thread."""
+        ids = None
+        if search_text:
+            ids = self.todo_list.search(search_text, cancelled)
+            if ids is None:
+                raise CancelledError()
+        if status_tasks is not None:
+            status_ids = {task.id for task in status_tasks}
+            ids = status_ids if ids is None else ids & status_ids
+        if cancelled.is_set():
+            raise CancelledError()
+        return None if ids is None else sorted(ids)
+
+    def on_filter_done(self, future, generation, search_text, predicate):
+        # Called on the filter thread; the signal queues apply_filter on the GUI thread
+        if future.cancelled():
+            return
+        try:
+            ids = future.result()
+        except CancelledError:
+            return
+        except Exception as e:
+            print(f"Error filtering tasks: {e}")
+            return
+        self.filterReady.emit(generation, (search_text, predicate, ids))
+
+    @measure("MainWindow.apply_filter")
+    def apply_filter(self, generation, result):
+        if generation != self.filter_generation:
+            return
+        self.filter_future = None
+        self.task_model.set_filter(*result)
 
+    @measure("MainWindow.update_statistics")
     def update_statistics(self):
         stats = self.todo_list.get_statistics()
         
@@ -708,6 +1112,24 @@ Priority Breakdown:
         self.stats_label.setText(stats_text)
         self.progress_bar.setValue(int(stats['completion_rate']))
         self.progress_bar.setVisible(True)
+        self.schedule_overdue_timer()
+
+    def schedule_overdue_timer(self):
+        next_due = self.todo_list.next_due_date()
+        if next_due is None:
+            self.overdue_timer.stop()
+            return
+        delay_ms = int((next_due - datetime.now()).total_seconds() * 1000) + 1
+        # QTimer intervals are a signed 32-bit number of milliseconds
+        self.overdue_timer.start(min(max(delay_ms, 0), 2**31 - 1))
+
+    def on_overdue_timer(self):
+        # Promoted rows are repainted through on_task_list_changed
+        self.todo_list.promote_overdue()
+        task_widget = self.current_task_widget()
+        if task_widget:
+            task_widget.update_style()
+        self.update_statistics()
 
 def main():
     app = QApplication(sys.argv)
@@ -716,7 +1138,9 @@ def main():
     font = QFont("Segoe UI", 10)
     app.setFont(font)
     
-    window = MainWindow()
+    # Optional data file argument; *.db selects the SQLite backend
+    filename = sys.argv[1] if len(sys.argv) > 1 else "todo_data.json"
+    window = MainWindow(filename)
     window.show()
     
     sys.exit(app.exec())
@@ -0,0 +1,24 @@
+"""Convert task data between the JSON and binary (*.todb) formats.
+
+    python todo_convert.py todo_data.json todo_data.todb
+    python todo_convert.py todo_data.todb todo_data.json
+
+The format is picked from each file's extension (*.db selects SQLite).
+"""
+import argparse
+
+from todo_core import convert_data_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source")
+    parser.add_argument("target")
+    args = parser.parse_args()
+
+    count = convert_data_file(args.source, args.target)
+    print(f"Converted {count} tasks from {args.source} to {args.target}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,675 @@
+import heapq
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+from enum import Enum
+from todo_perf import measure
+from todo_search import SearchIndex
+from todo_storage import JsonStorage, SqliteStorage, WriteBehindStorage, storage_for
+
+class Priority(Enum):
+    LOW = 1
+    MEDIUM = 2
+    HIGH = 3
+    URGENT = 4
+
+class Status(Enum):
+    PENDING = "⏳ Pending"
+    IN_PROGRESS = "🔄 In Progress"
+    COMPLETED = "✅ Completed"
+    CANCELLED = "❌ Cancelled"
+
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+
+# Faster than calling the Enum for every task on load
+_PRIORITIES = {priority.value: priority for priority in Priority}
+_STATUSES = {status.value: status for status in Status}
+
+def to_timestamp(value):
+    """Whole seconds since 1970-01-01 for a naive datetime or a date."""
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, datetime.min.time())
+    return (value - _EPOCH) // _SECOND
+
+def from_timestamp(timestamp):
+    if timestamp is None:
+        return None
+    return _EPOCH + timedelta(seconds=timestamp)
+
+def _parse_timestamp(value):
+    # JSON stores ISO strings, the binary snapshot stores timestamps
+    if value is None or isinstance(value, int):
+        return value
+    return to_timestamp(datetime.fromisoformat(value))
+
+def _indexed_attribute(name, convert=None):
+    """Property that tells the owning TodoList when an indexed field changes."""
+    attr = '_' + name
+
+    def getter(self):
+        return getattr(self, attr)
+
+    def setter(self, value):
+        if convert is not None:
+            value = convert(value)
+        old = getattr(self, attr)
+        setattr(self, attr, value)
+        if self._owner is not None and old != value:
+            self._owner._reindex(self, name, old, value)
+
+    return property(getter, setter)
+
+def _timestamp_attribute(name):
+    """datetime property backed by an integer timestamp slot."""
+    attr = '_' + name
+
+    def getter(self):
+        return from_timestamp(getattr(self, attr))
+
+    def setter(self, value):
+        setattr(self, attr, to_timestamp(value))
+
+    return property(getter, setter)
+
+class Task:
+    """A single todo item.
+
+    Tasks use __slots__, share interned category strings and keep dates as
+    integer timestamps, so each one stays small even when hundreds of
+    thousands are loaded. The datetime attributes are built on access.
+    """
+
+    __slots__ = ('_owner', 'id', '_title', '_description', '_priority', '_status',
+                 '_category', '_due_ts', '_created_ts', '_completed_ts')
+
+    title = _indexed_attribute('title')
+    description = _indexed_attribute('description')
+
+    status = _indexed_attribute('status')
+    priority = _indexed_attribute('priority')
+    category = _indexed_attribute('category', sys.intern)
+    created_at = _timestamp_attribute('created_ts')
+    completed_at = _timestamp_attribute('completed_ts')
+
+    def __init__(self, id, title, description="", priority=Priority.MEDIUM, 
+                 due_date=None, category="General", created_at=None):
+        self._owner = None
+        self.id = id
+        self._title = title
+        self._description = description
+        self._priority = priority
+        self._status = Status.PENDING
+        self._due_ts = to_timestamp(due_date)
+        self._category = sys.intern(category)
+        self._created_ts = to_timestamp(created_at or datetime.now())
+        self._completed_ts = None
+
+    @property
+    def due_date(self):
+        return from_timestamp(self._due_ts)
+
+    @due_date.setter
+    def due_date(self, value):
+        old = self._due_ts
+        self._due_ts = to_timestamp(value)
+        if self._owner is not None and old != self._due_ts:
+            # The due-date index works on timestamps, not datetimes
+            self._owner._reindex(self, 'due_date', old, self._due_ts)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'title': self.title,
+            'description': self.description,
+            'priority': self.priority.value,
+            'status': self.status.value,
+            'due_date': self.due_date.isoformat() if self.due_date else None,
+            'category': self.category,
+            'created_at': self.created_at.isoformat(),
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
+
+    def to_record(self):
+        """Flat tuple with raw timestamps, for binary snapshots."""
+        return (self.id, self.title, self.description, self._priority.value,
+                self._status.value, self._category, self._due_ts,
+                self._created_ts, self._completed_ts)
+
+    @classmethod
+    def from_dict(cls, data):
+        # Fill the slots directly; this runs once per task on every load
+        task = cls.__new__(cls)
+        task._owner = None
+        task.id = data['id']
+        task._title = data['title']
+        task._description = data['description']
+        task._priority = _PRIORITIES[data['priority']]
+        task._status = _STATUSES[data['status']]
+        task._category = sys.intern(data['category'])
+        task._due_ts = _parse_timestamp(data['due_date'])
+        task._created_ts = _parse_timestamp(data['created_at'])
+        task._completed_ts = _parse_timestamp(data['completed_at'])
+        return task
+
+    def is_overdue(self):
+        if self._owner is not None:
+            # The owning list promotes tasks into its overdue set on time
+            return self.id in self._owner._overdue
+        if self._due_ts is not None and self.status != Status.COMPLETED:
+            return self._due_ts <= to_timestamp(datetime.now())
+        return False
+
+class TodoList:
+    INDEXED_FIELDS = ('status', 'priority', 'category')
+
+    def __init__(self, filename="todo_data.json", storage=None, autoload=True):
+        self.filename = filename
+        self.storage = storage or JsonStorage(filename)
+        self.next_id = 1
+        # Guards the task dict against a background saver taking a snapshot
+        self.lock = threading.RLock()
+        self._listeners = []
+        # Changes made while tasks are still loading, as (op, payload)
+        self._deferred = None
+        self._search_build_lock = threading.Lock()
+        self._clear_indexes()
+        if autoload:
+            self.load_tasks()
+
+    @property
+    def tasks(self):
+        with self.lock:
+            return list(self._tasks_by_id.values())
+
+    def snapshot(self):
+        """Consistent (tasks, next_id) pair for storages that save later."""
+        with self.lock:
+            return self.tasks, self.next_id
+
+    def _clear_indexes(self):
+        self._tasks_by_id = {}
+        # field name -> field value -> {task id: task}
+        self._indexes = {field: {} for field in self.INDEXED_FIELDS}
+        # Min-heap of (due timestamp, id) for open tasks that are not overdue yet.
+        # Entries are invalidated lazily and skipped when popped.
+        self._upcoming = []
+        self._overdue = {}
+        # Trigram index for search(), built on first use
+        self._search = None
+        # Search index changes made while the index is being built, as
+        # (add, task id, title, description); None when no build is running
+        self._search_log = None
+
+    def _index(self, task):
+        task._owner = self
+        with self.lock:
+            self._tasks_by_id[task.id] = task
+        for field, index in self._indexes.items():
+            index.setdefault(getattr(task, field), {})[task.id] = task
+        self._track_due(task.id, task._due_ts, task.status, True)
+        self._update_search(True, task.id, task.title, task.description)
+
+    def _unindex(self, task):
+        task._owner = None
+        with self.lock:
+            del self._tasks_by_id[task.id]
+        for field, index in self._indexes.items():
+            self._remove_from_bucket(index, getattr(task, field), task.id)
+        self._track_due(task.id, task._due_ts, task.status, False)
+        self._update_search(False, task.id, task.title, task.description)
+
+    def _reindex(self, task, field, old, new):
+        """Called by Task when an indexed field is reassigned."""
+        if field in self._indexes:
+            index = self._indexes[field]
+            self._remove_from_bucket(index, old, task.id)
+            index.setdefault(new, {})[task.id] = task
+        if field == 'status' and (old == Status.COMPLETED) != (new == Status.COMPLETED):
+            self._track_due(task.id, task._due_ts, old, False)
+            self._track_due(task.id, task._due_ts, new, True)
+        elif field == 'due_date':
+            self._track_due(task.id, old, task.status, False)
+            self._track_due(task.id, new, task.status, True)
+        elif field in ('title', 'description'):
+            with self.lock:
+                if field == 'title':
+                    self._update_search(False, task.id, old, task.description)
+                else:
+                    self._update_search(False, task.id, task.title, old)
+                self._update_search(True, task.id, task.title, task.description)
+
+    def _update_search(self, add, task_id, title, description):
+        if self._search is None and self._search_log is None:
+            return
+        with self.lock:
+            if self._search is not None:
+                (self._search.add if add else self._search.remove)(task_id, title, description)
+            elif self._search_log is not None:
+                self._search_log.append((add, task_id, title, description))
+
+    def _track_due(self, task_id, due_ts, status, add):
+        if due_ts is None or status == Status.COMPLETED:
+            return
+        if not add:
+            self._overdue.pop(task_id, None)
+        elif due_ts <= to_timestamp(datetime.now()):
+            self._overdue[task_id] = self._tasks_by_id[task_id]
+        else:
+            if len(self._upcoming) > 2 * len(self._tasks_by_id) + 64:
+                self._upcoming = [entry for entry in self._upcoming if self._is_upcoming(entry)]
+                heapq.heapify(self._upcoming)
+            heapq.heappush(self._upcoming, (due_ts, task_id))
+
+    def _is_upcoming(self, entry):
+        due_ts, task_id = entry
+        task = self._tasks_by_id.get(task_id)
+        return (task is not None and task._due_ts == due_ts
+                and task.status != Status.COMPLETED and task_id not in self._overdue)
+
+    def next_due_date(self):
+        """Due date of the next task that will become overdue, or None."""
+        while self._upcoming and not self._is_upcoming(self._upcoming[0]):
+            heapq.heappop(self._upcoming)
+        return from_timestamp(self._upcoming[0][0]) if self._upcoming else None
+
+    def promote_overdue(self, now=None):
+        """Move tasks whose due date has passed into the overdue set.
+
+        Returns the newly overdue tasks. Cost is O(k log N) for the k tasks
+        promoted, so it is cheap to call from a timer or before a query.
+        """
+        now_ts = to_timestamp(now or datetime.now())
+        promoted = []
+        while self._upcoming and self._upcoming[0][0] <= now_ts:
+            entry = heapq.heappop(self._upcoming)
+            if self._is_upcoming(entry):
+                task = self._tasks_by_id[entry[1]]
+                self._overdue[task.id] = task
+                promoted.append(task)
+        for task in promoted:
+            self._notify('updated', task)
+        return promoted
+
+    @staticmethod
+    def _remove_from_bucket(index, value, task_id):
+        bucket = index.get(value)
+        if bucket is not None:
+            bucket.pop(task_id, None)
+            if not bucket:
+                del index[value]
+
+    def load_tasks(self):
+        for _ in self.iter_load_tasks():
+            pass
+
+    def iter_load_tasks(self, chunk_size=500):
+        """Stream tasks from storage, yielding each chunk once it is indexed.
+
+        The file is parsed incrementally, so a caller can show the first
+        chunk without waiting for the whole history to load.
+        """
+        self._clear_indexes()
+        self.begin_loading()
+        try:
+            chunks = self.read_tasks(chunk_size)
+            while True:
+                try:
+                    chunk = next(chunks)
+                except StopIteration as done:
+                    self.next_id = done.value
+                    break
+                self.add_loaded_tasks(chunk)
+                yield chunk
+        except Exception as e:
+            print(f"Error loading tasks: {e}")
+            self._clear_indexes()
+            self.next_id = 1
+            self.cancel_loading()
+        else:
+            self.finish_loading()
+
+    def read_tasks(self, chunk_size=500):
+        """Parse tasks from storage in chunks, without adding them.
+
+        Touches nothing but the storage, so it can run on a loader thread
+        while the owning thread passes each chunk to add_loaded_tasks. The
+        generator returns the stored next_id.
+        """
+        records = self.storage.iter_load()
+        while True:
+            chunk, done, next_id = self._read_chunk(records, chunk_size)
+            if chunk:
+                yield chunk
+            if done:
+                return next_id
+
+    @measure("TodoList.read_tasks")
+    def _read_chunk(self, records, chunk_size):
+        # Timed per chunk: a generator returns before any of its work is done
+        chunk = []
+        while len(chunk) < chunk_size:
+            try:
+                task_data = next(records)
+            except StopIteration as done:
+                return chunk, True, done.value
+            chunk.append(Task.from_dict(task_data))
+        return chunk, False, None
+
+    @measure("TodoList.add_loaded_tasks")
+    def add_loaded_tasks(self, tasks):
+        """Index tasks from read_tasks; next_id always stays past them."""
+        for task in tasks:
+            self._index(task)
+        if tasks:
+            self.next_id = max(self.next_id, max(task.id for task in tasks) + 1)
+
+    def begin_loading(self):
+        """Hold back writes until finish_loading.
+
+        A save now would replace the file with the part loaded so far, so
+        changes to tasks already shown are kept and written afterwards.
+        """
+        self._deferred = []
+
+    def finish_loading(self, next_id=None):
+        """Write the changes held back since begin_loading.
+
+        Pass the next_id returned by read_tasks.
+        """
+        if next_id is not None:
+            self.next_id = max(self.next_id, next_id)
+        deferred, self._deferred = self._deferred, None
+        for op, payload in deferred or ():
+            self._record(op, payload)
+
+    def cancel_loading(self):
+        """Drop the changes held back since begin_loading.
+
+        For a load that failed or was cut short: writing them would replace
+        the file with the tasks loaded so far.
+        """
+        self._deferred = None
+
+    def has_deferred_changes(self):
+        return bool(self._deferred)
+
+    def save_tasks(self):
+        try:
+            self.storage.save(self.tasks, self.next_id)
+            return True
+        except Exception as e:
+            print(f"Error saving tasks: {e}")
+            return False
+
+    def save_task(self, task):
+        """Persist changes made directly on a task (e.g. from the UI)."""
+        self._notify('updated', task)
+        return self._record('update', task)
+
+    def add_listener(self, listener):
+        """Call listener(event, task) after each change to the list.
+
+        event is 'added', 'updated' or 'removed'. Tasks streamed in by
+        iter_load_tasks are not reported.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, event, task):
+        for listener in self._listeners:
+            listener(event, task)
+
+    def close(self):
+        """Flush pending writes and release the storage."""
+        self.storage.close()
+
+    def _record(self, op, payload):
+        if self._deferred is not None:
+            self._deferred.append((op, payload))
+            return True
+        try:
+            self.storage.append(op, payload, self)
+            return True
+        except Exception as e:
+            print(f"Error saving tasks: {e}")
+            return False
+
+    def add_task(self, title, description="", priority=Priority.MEDIUM, 
+                 due_date=None, category="General"):
+        task = Task(self.next_id, title, description, priority, due_date, category)
+        self.next_id += 1
+        self._index(task)
+        self._notify('added', task)
+        if self._record('add', task):
+            return task
+        return None
+
+    def update_task(self, task_id, **kwargs):
+        task = self.get_task(task_id)
+        if task:
+            for key, value in kwargs.items():
+                if hasattr(task, key):
+                    setattr(task, key, value)
+            self._notify('updated', task)
+            return self._record('update', task)
+        return False
+
+    def delete_task(self, task_id):
+        task = self.get_task(task_id)
+        if task:
+            self._unindex(task)
+            self._notify('removed', task)
+            return self._record('delete', task_id)
+        return False
+
+    def get_task(self, task_id):
+        return self._tasks_by_id.get(task_id)
+
+    def get_tasks_by_status(self, status):
+        return list(self._indexes['status'].get(status, {}).values())
+
+    def get_tasks_by_priority(self, priority):
+        return list(self._indexes['priority'].get(priority, {}).values())
+
+    def get_tasks_by_category(self, category):
+        return list(self._indexes['category'].get(category, {}).values())
+
+    def get_overdue_tasks(self):
+        self.promote_overdue()
+        return list(self._overdue.values())
+
+    def search(self, query, cancelled=None):
+        """Ids of tasks whose title or description contains query.
+
+        Case-insensitive. The trigram index is built on the first search and
+        kept up to date from then on. Runs under the list lock, so it may be
+        called from a worker thread; with a cancelled Event it returns None
+        once the event is set.
+        """
+        while True:
+            with self.lock:
+                if self._search is not None:
+                    return self._search.search(query, cancelled)
+            self._build_search_index()
+
+    def _build_search_index(self):
+        # The build takes seconds for a large list. It runs outside the list
+        # lock so the GUI thread can keep editing; its changes are logged
+        # meanwhile and replayed before the index is swapped in.
+        with self._search_build_lock:
+            with self.lock:
+                if self._search is not None:
+                    return
+                self._search_log = []
+                tasks_by_id = self._tasks_by_id
+                entries = [(task.id, task.title, task.description) for task in tasks_by_id.values()]
+            index = SearchIndex(tasks_by_id)
+            for entry in entries:
+                index.add(*entry)
+            with self.lock:
+                # Tasks reloaded during the build; the next search starts over
+                if self._search_log is None or self._tasks_by_id is not tasks_by_id:
+                    return
+                for add, *entry in self._search_log:
+                    (index.add if add else index.remove)(*entry)
+                self._search_log = None
+                self._search = index
+
+    def get_statistics(self):
+        # Bucket sizes are kept current by _index/_reindex, so nothing here
+        # walks the task list.
+        self.promote_overdue()
+        status_counts = self._indexes['status']
+        priority_counts = self._indexes['priority']
+
+        total = len(self._tasks_by_id)
+        completed = len(status_counts.get(Status.COMPLETED, ()))
+        pending = len(status_counts.get(Status.PENDING, ()))
+        in_progress = len(status_counts.get(Status.IN_PROGRESS, ()))
+        overdue = len(self._overdue)
+        
+        completion_rate = (completed / total * 100) if total > 0 else 0
+        
+        priority_stats = {}
+        for priority in Priority:
+            priority_stats[priority] = len(priority_counts.get(priority, ()))
+            
+        return {
+            'total': total,
+            'completed': completed,
+            'pending': pending,
+            'in_progress': in_progress,
+            'overdue': overdue,
+            'completion_rate': completion_rate,
+            'priority_stats': priority_stats
+        }
+
+class SqliteTodoList(TodoList):
+    """TodoList whose tasks live in SQLite instead of memory.
+
+    Lookups become indexed queries and every mutation writes one row, so
+    nothing but the tasks a caller asks for is ever loaded.
+    """
+
+    def __init__(self, filename="todo_data.db"):
+        super().__init__(filename, SqliteStorage(filename))
+        self._last_promotion = datetime.now()
+
+    @property
+    def tasks(self):
+        return [Task.from_dict(row) for row in self.storage.load()[0]]
+
+    def load_tasks(self):
+        self.next_id = self.storage.get_next_id()
+
+    def iter_load_tasks(self, chunk_size=500):
+        # Rows are only read for display; lookups still go to SQL
+        self.load_tasks()
+        yield from self.read_tasks(chunk_size)
+
+    def add_loaded_tasks(self, tasks):
+        # Nothing to index, and next_id comes from the database
+        pass
+
+    def begin_loading(self):
+        # Every row is written on its own, so there is no partial file to protect
+        pass
+
+    def save_tasks(self):
+        # Every mutation is already committed row by row
+        return True
+
+    def add_task(self, title, description="", priority=Priority.MEDIUM,
+                 due_date=None, category="General"):
+        task = Task(self.next_id, title, description, priority, due_date, category)
+        self.next_id += 1
+        self._notify('added', task)
+        if self._record('add', task):
+            return task
+        return None
+
+    def delete_task(self, task_id):
+        task = self.get_task(task_id)
+        if task:
+            self._notify('removed', task)
+            return self._record('delete', task_id)
+        return False
+
+    def get_task(self, task_id):
+        row = self.storage.get(task_id)
+        return Task.from_dict(row) if row else None
+
+    def get_tasks_by_status(self, status):
+        return [Task.from_dict(row) for row in self.storage.find('status', status.value)]
+
+    def get_tasks_by_priority(self, priority):
+        return [Task.from_dict(row) for row in self.storage.find('priority', priority.value)]
+
+    def get_tasks_by_category(self, category):
+        return [Task.from_dict(row) for row in self.storage.find('category', category)]
+
+    def get_overdue_tasks(self):
+        rows = self.storage.find_overdue(datetime.now(), Status.COMPLETED.value)
+        return [Task.from_dict(row) for row in rows]
+
+    def search(self, query, cancelled=None):
+        return self.storage.search(query)
+
+    def next_due_date(self):
+        due_date = self.storage.next_due_date(self._last_promotion, Status.COMPLETED.value)
+        return datetime.fromisoformat(due_date) if due_date else None
+
+    def promote_overdue(self, now=None):
+        now = now or datetime.now()
+        rows = self.storage.find_due_between(self._last_promotion, now, Status.COMPLETED.value)
+        self._last_promotion = now
+        promoted = [Task.from_dict(row) for row in rows]
+        for task in promoted:
+            self._notify('updated', task)
+        return promoted
+
+    def get_statistics(self):
+        total, status_counts, priority_counts, overdue = self.storage.counts(
+            datetime.now(), Status.COMPLETED.value)
+        completed = status_counts.get(Status.COMPLETED.value, 0)
+
+        return {
+            'total': total,
+            'completed': completed,
+            'pending': status_counts.get(Status.PENDING.value, 0),
+            'in_progress': status_counts.get(Status.IN_PROGRESS.value, 0),
+            'overdue': overdue,
+            'completion_rate': (completed / total * 100) if total > 0 else 0,
+            'priority_stats': {priority: priority_counts.get(priority.value, 0) for priority in Priority}
+        }
+
+def create_todo_list(filename, autoload=True):
+    """Pick the storage backend from the data file extension."""
+    if filename.endswith(('.db', '.sqlite')):
+        return SqliteTodoList(filename)
+    return TodoList(filename, WriteBehindStorage(storage_for(filename)), autoload)
+
+def convert_data_file(source, target):
+    """Copy every task from one data file to another, e.g. JSON to *.todb."""
+    if source.endswith(('.db', '.sqlite')) and not os.path.exists(source):
+        # Opening it would create an empty database
+        raise FileNotFoundError(source)
+    source_storage = storage_for(source)
+    try:
+        task_dicts, next_id = source_storage.load()
+    finally:
+        source_storage.close()
+    # A JSON list may live only in its journal until the first compaction,
+    # so what counts is whether anything was loaded
+    if not task_dicts and next_id == 1:
+        raise FileNotFoundError(f"No tasks stored in {source}")
+    tasks = [Task.from_dict(task_data) for task_data in task_dicts]
+    target_storage = storage_for(target)
+    try:
+        target_storage.save(tasks, next_id)
+    finally:
+        target_storage.close()
+    return len(tasks)
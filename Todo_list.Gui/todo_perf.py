@@ -0,0 +1,112 @@
+"""Opt-in timing of the todo app's hot paths.
+
+Functions wrapped with @measure("name") record their call count and a
+latency histogram while recording is enabled. When it is disabled the
+wrapper only checks a flag before calling through. Recording starts
+enabled when TODO_PERF=1 is set, and can be switched from the app's
+performance dock (F12).
+"""
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# Upper bucket bounds in milliseconds; the last bucket is open-ended
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class Histogram:
+    """Call count, total time and bucketed latencies for one name."""
+
+    __slots__ = ('count', 'total', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.buckets[bisect_left(BUCKETS_MS, seconds * 1000)] += 1
+
+    def percentile(self, fraction):
+        """Upper bound in ms of the bucket holding that fraction of calls."""
+        wanted = fraction * self.count
+        seen = 0
+        for bound, calls in zip(BUCKETS_MS, self.buckets):
+            seen += calls
+            if seen >= wanted:
+                return bound
+        return self.max * 1000
+
+    def to_dict(self):
+        labels = [f"<={bound}ms" for bound in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"]
+        return {
+            'count': self.count,
+            'total_ms': self.total * 1000,
+            'mean_ms': self.total / self.count * 1000 if self.count else 0.0,
+            'max_ms': self.max * 1000,
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'histogram': dict(zip(labels, self.buckets)),
+        }
+
+
+class Instrumentation:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._histograms = {}
+        # Workers (loader, filter) record too
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.add(seconds)
+
+    def measure(self, name):
+        """Decorator that records each call of the function under name."""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - started)
+            return wrapper
+        return decorate
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def stats(self):
+        with self._lock:
+            return {name: histogram.to_dict() for name, histogram in sorted(self._histograms.items())}
+
+    def report(self):
+        """Plain-text table of the recorded stats, for the overlay."""
+        lines = [f"{'name':<28} {'calls':>7} {'mean ms':>9} {'p95 ms':>8} {'max ms':>9}"]
+        for name, stats in self.stats().items():
+            lines.append(f"{name:<28} {stats['count']:>7} {stats['mean_ms']:>9.2f} "
+                         f"{stats['p95_ms']:>8.2f} {stats['max_ms']:>9.2f}")
+        return "\n".join(lines)
+
+    def export(self, filename):
+        data = {'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'stats': self.stats()}
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+
+
+perf = Instrumentation(enabled=os.environ.get("TODO_PERF") == "1")
+measure = perf.measure
@@ -0,0 +1,52 @@
+def trigrams(text):
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SearchIndex:
+    """Trigram index over task titles and descriptions.
+
+    Each trigram maps to the set of task ids whose title or description
+    contains it. A query of three or more characters intersects the sets
+    for its trigrams and only checks the few candidates left against the
+    real text; shorter queries fall back to scanning every task.
+    """
+
+    def __init__(self, tasks_by_id):
+        # Shared with the owning TodoList, used to verify candidates
+        self._tasks_by_id = tasks_by_id
+        self._postings = {}
+
+    def add(self, task_id, title, description):
+        for gram in trigrams(title) | trigrams(description):
+            self._postings.setdefault(gram, set()).add(task_id)
+
+    def remove(self, task_id, title, description):
+        for gram in trigrams(title) | trigrams(description):
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(task_id)
+                if not posting:
+                    del self._postings[gram]
+
+    def search(self, query, cancelled=None):
+        """Set of ids of tasks whose title or description contains query.
+
+        cancelled is an optional threading.Event checked while candidates
+        are verified; the search stops early and returns None once it is set.
+        """
+        query = query.lower()
+        if len(query) < 3:
+            candidates = self._tasks_by_id.keys()
+        else:
+            postings = sorted((self._postings.get(gram, set()) for gram in trigrams(query)), key=len)
+            candidates = postings[0].intersection(*postings[1:])
+
+        matches = set()
+        for count, task_id in enumerate(candidates):
+            if cancelled is not None and count % 4096 == 0 and cancelled.is_set():
+                return None
+            task = self._tasks_by_id[task_id]
+            if query in task.title.lower() or query in task.description.lower():
+                matches.add(task_id)
+        return matches
@@ -0,0 +1,757 @@
+import contextlib
+import json
+import os
+import re
+import sqlite3
+import struct
+import threading
+from collections import Counter
+from todo_perf import measure
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+# What may still follow a number's last digit: "12." or "1e" cut at a block edge
+_NUMBER_TAIL = re.compile(r'[-+.eE0-9]*\Z')
+
+
+def atomic_write(filename, data):
+    """Write text or bytes so readers never observe a half-written file."""
+    temp_name = filename + ".tmp"
+    with open(temp_name, 'wb' if isinstance(data, bytes) else 'w') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_name, filename)
+
+
+class _JsonStream:
+    """Reads JSON values from a file one block at a time."""
+
+    def __init__(self, f, block_size=1 << 16):
+        self.f = f
+        self.block_size = block_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        block = self.f.read(self.block_size)
+        if not block:
+            self.eof = True
+            return False
+        # Drop what has been consumed so memory stays bounded
+        self.buf = self.buf[self.pos:] + block
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON data")
+
+    def expect(self, chars):
+        char = self.peek()
+        if char not in chars:
+            raise ValueError(f"Expected one of {chars!r} but found {char!r}")
+        self.pos += 1
+        return char
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            else:
+                # A number that runs up to the buffer edge may continue in the next block
+                if self.eof or type(value) not in (int, float) or not _NUMBER_TAIL.match(self.buf, end):
+                    self.pos = end
+                    return value
+            self._fill()
+
+
+def iter_json_object(f, stream_key):
+    """Incrementally parse a top-level JSON object from f.
+
+    Items of the array stored under ``stream_key`` are yielded one at a
+    time; every other member is collected into a dict that becomes the
+    generator's return value.
+    """
+    stream = _JsonStream(f)
+    members = {}
+    stream.expect('{')
+    if stream.peek() == '}':
+        return members
+    while True:
+        key = stream.value()
+        stream.expect(':')
+        if key == stream_key and stream.peek() == '[':
+            stream.expect('[')
+            if stream.peek() == ']':
+                stream.expect(']')
+            else:
+                while True:
+                    yield stream.value()
+                    if stream.expect(',]') == ']':
+                        break
+        else:
+            members[key] = stream.value()
+        if stream.expect(',}') == '}':
+            return members
+
+
+class JsonStorage:
+    """Stores the whole task list as one JSON document.
+
+    Every change rewrites the full file, which is simple and keeps the file
+    human readable but costs O(N) per mutation.
+    """
+
+    def __init__(self, filename="todo_data.json"):
+        self.filename = filename
+
+    def load(self):
+        if not os.path.exists(self.filename):
+            return [], 1
+        with open(self.filename, 'r') as f:
+            data = json.load(f)
+        return data['tasks'], data['next_id']
+
+    def iter_load(self):
+        """Yield task dicts as the file is parsed; returns next_id when done."""
+        if not os.path.exists(self.filename):
+            return 1
+        with open(self.filename, 'r') as f:
+            members = yield from iter_json_object(f, 'tasks')
+        return members['next_id']
+
+    def save(self, tasks, next_id):
+        data = {
+            'tasks': [task.to_dict() for task in tasks],
+            'next_id': next_id
+        }
+        atomic_write(self.filename, json.dumps(data, indent=2))
+
+    def append(self, op, payload, todo_list):
+        """Persist a single change ('add', 'update' or 'delete')."""
+        self.append_many([(op, payload)], todo_list)
+
+    def append_many(self, records, todo_list):
+        """Persist several (op, payload) changes with one write."""
+        tasks, next_id = todo_list.snapshot()
+        self.save(tasks, next_id)
+
+    def close(self):
+        pass
+
+
+class JournalStorage(JsonStorage):
+    """JSON snapshot plus an append-only journal of changes.
+
+    Each mutation appends one compact JSON line to ``<filename>.journal``,
+    fsynced before append returns (append_many writes and syncs a batch of
+    lines at once). Loading replays the journal on top of the snapshot, and once the journal
+    grows past ``compact_threshold`` bytes it is folded back into a fresh
+    snapshot. Replaying a record twice is harmless, so a crash between
+    writing the snapshot and truncating the journal loses nothing.
+    """
+
+    def __init__(self, filename="todo_data.json", compact_threshold=1024 * 1024):
+        super().__init__(filename)
+        self.journal_filename = filename + ".journal"
+        self.compact_threshold = compact_threshold
+        self._journal = None
+        self._journal_size = 0
+
+    def _read_journal(self):
+        """Final state of every task touched by the journal.
+
+        Returns ({task id: task dict, or None if deleted}, next_id). A torn
+        final record from an interrupted write is cut off the file, so the
+        next append starts on a line of its own; an unreadable record
+        further up is skipped, keeping the ones after it.
+        """
+        changes = {}
+        next_id = 1
+        self._journal_size = 0
+
+        if os.path.exists(self.journal_filename):
+            # Bounded by compact_threshold, so it fits in memory
+            with open(self.journal_filename, 'rb') as f:
+                lines = f.readlines()
+            for number, line in enumerate(lines, 1):
+                if not line.strip():
+                    self._journal_size += len(line)
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    if number == len(lines):
+                        print(f"Dropping incomplete journal record in {self.journal_filename}")
+                        self.close()
+                        os.truncate(self.journal_filename, self._journal_size)
+                        break
+                    print(f"Skipping unreadable record on line {number} of {self.journal_filename}")
+                    self._journal_size += len(line)
+                    continue
+                self._journal_size += len(line)
+                if record['op'] == 'delete':
+                    changes[record['id']] = None
+                    next_id = max(next_id, record.get('next_id', 1))
+                else:
+                    task = record['task']
+                    changes[task['id']] = task
+                    next_id = max(next_id, record.get('next_id', task['id'] + 1))
+
+        return changes, next_id
+
+    def load(self):
+        tasks, next_id = super().load()
+        changes, journal_next_id = self._read_journal()
+        tasks_by_id = {task['id']: task for task in tasks}
+        for task_id, task in changes.items():
+            if task is None:
+                tasks_by_id.pop(task_id, None)
+            else:
+                tasks_by_id[task_id] = task
+        return list(tasks_by_id.values()), max(next_id, journal_next_id)
+
+    def iter_load(self):
+        # The journal is bounded by compact_threshold, so it is read up
+        # front and applied while the snapshot streams past.
+        changes, journal_next_id = self._read_journal()
+        snapshot = super().iter_load()
+        while True:
+            try:
+                task = next(snapshot)
+            except StopIteration as done:
+                next_id = done.value
+                break
+            if task['id'] in changes:
+                task = changes.pop(task['id'])
+            if task is not None:
+                yield task
+        for task in changes.values():
+            if task is not None:
+                yield task
+        return max(next_id, journal_next_id)
+
+    def save(self, tasks, next_id):
+        super().save(tasks, next_id)
+        self._truncate_journal()
+
+    @measure("JournalStorage.append_many")
+    def append_many(self, records, todo_list):
+        lines = []
+        for op, payload in records:
+            # Deletes carry next_id too: the add they cancel may never be written
+            if op == 'delete':
+                record = {'op': op, 'id': payload, 'next_id': todo_list.next_id}
+            else:
+                record = {'op': op, 'task': payload.to_dict(), 'next_id': todo_list.next_id}
+            lines.append(json.dumps(record, separators=(',', ':')) + "\n")
+        data = "".join(lines).encode('utf-8')
+
+        try:
+            if self._journal is None:
+                self._journal = self._open_journal()
+                self._journal_size = self._journal.tell()
+            self._journal.write(data)
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+        except Exception:
+            # Part of data may have reached the file; reopening for the next
+            # append puts that on a line of its own
+            with contextlib.suppress(OSError):
+                self.close()
+            raise
+        self._journal_size += len(data)
+
+        if self._journal_size > self.compact_threshold:
+            self.compact(todo_list)
+
+    def _open_journal(self):
+        journal = open(self.journal_filename, 'ab')
+        # A record cut short before its newline must not swallow the next one
+        if journal.tell() and not _ends_with_newline(self.journal_filename):
+            journal.write(b"\n")
+        return journal
+
+    @measure("JournalStorage.compact")
+    def compact(self, todo_list):
+        """Fold the journal into a new snapshot and start an empty journal."""
+        self.save(todo_list.tasks, todo_list.next_id)
+
+    def _truncate_journal(self):
+        self.close()
+        open(self.journal_filename, 'w').close()
+        self._journal_size = 0
+
+    def close(self):
+        journal, self._journal = self._journal, None
+        if journal is not None:
+            journal.close()
+
+
+def _ends_with_newline(filename):
+    with open(filename, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+class BinaryStorage(JsonStorage):
+    """Compact binary snapshot of the task list (``*.todb``).
+
+    Layout, all little-endian::
+
+        b'TODB' u16 version  u32 next_id
+        u32 string count, then (u32 length, utf-8 bytes) per string
+        u32 task count, then one fixed-size record per task
+        the utf-8 titles and descriptions of all tasks, back to back
+
+    Statuses and categories are stored as indexes into the string table,
+    and dates as integer timestamps, so nothing is formatted or parsed as
+    text on save or load.
+    """
+
+    MAGIC = b'TODB'
+    VERSION = 1
+    HEADER = struct.Struct('<4sHI')
+    COUNT = struct.Struct('<I')
+    # id, priority, status, category, due, created, completed, title/desc length
+    RECORD = struct.Struct('<IBIIqqqII')
+    NONE = -2 ** 63
+
+    def load(self):
+        tasks = []
+        next_id = _drain(self.iter_load(), tasks)
+        return tasks, next_id
+
+    def iter_load(self):
+        if not os.path.exists(self.filename):
+            return 1
+        with open(self.filename, 'rb') as f:
+            data = f.read()
+
+        magic, version, next_id = self.HEADER.unpack_from(data, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            raise ValueError(f"{self.filename} is not a version {self.VERSION} task snapshot")
+        pos = self.HEADER.size
+
+        strings = []
+        (string_count,) = self.COUNT.unpack_from(data, pos)
+        pos += self.COUNT.size
+        for _ in range(string_count):
+            (length,) = self.COUNT.unpack_from(data, pos)
+            pos += self.COUNT.size
+            strings.append(data[pos:pos + length].decode('utf-8'))
+            pos += length
+
+        (task_count,) = self.COUNT.unpack_from(data, pos)
+        pos += self.COUNT.size
+        records_end = pos + task_count * self.RECORD.size
+        text_pos = records_end
+        none = self.NONE
+        for (task_id, priority, status, category, due, created, completed,
+             title_length, description_length) in self.RECORD.iter_unpack(data[pos:records_end]):
+            title_end = text_pos + title_length
+            title = data[text_pos:title_end].decode('utf-8')
+            text_pos = title_end + description_length
+            description = data[title_end:text_pos].decode('utf-8')
+            yield {
+                'id': task_id,
+                'title': title,
+                'description': description,
+                'priority': priority,
+                'status': strings[status],
+                'due_date': None if due == none else due,
+                'category': strings[category],
+                'created_at': created,
+                'completed_at': None if completed == none else completed
+            }
+        return next_id
+
+    def save(self, tasks, next_id):
+        string_codes = {}
+        records = []
+        texts = []
+        pack_record = self.RECORD.pack
+        none = self.NONE
+        for task in tasks:
+            (task_id, title, description, priority, status, category,
+             due, created, completed) = task.to_record()
+            status_code = string_codes.setdefault(status, len(string_codes))
+            category_code = string_codes.setdefault(category, len(string_codes))
+            title = title.encode('utf-8')
+            description = description.encode('utf-8')
+            records.append(pack_record(
+                task_id, priority, status_code, category_code,
+                none if due is None else due, created,
+                none if completed is None else completed,
+                len(title), len(description)))
+            texts.append(title)
+            texts.append(description)
+
+        parts = [self.HEADER.pack(self.MAGIC, self.VERSION, next_id),
+                 self.COUNT.pack(len(string_codes))]
+        for string in string_codes:
+            encoded = string.encode('utf-8')
+            parts.append(self.COUNT.pack(len(encoded)))
+            parts.append(encoded)
+        parts.append(self.COUNT.pack(len(records)))
+        parts.extend(records)
+        parts.extend(texts)
+        atomic_write(self.filename, b''.join(parts))
+
+
+def _drain(generator, items):
+    """Collect what a loading generator yields and return its result."""
+    while True:
+        try:
+            items.append(next(generator))
+        except StopIteration as done:
+            return done.value
+
+
+def storage_for(filename):
+    """Storage matching a data file's extension."""
+    if filename.endswith(('.db', '.sqlite')):
+        return SqliteStorage(filename)
+    if filename.endswith('.todb'):
+        return BinaryStorage(filename)
+    return JournalStorage(filename)
+
+
+class SqliteStorage:
+    """Stores tasks as rows of a local SQLite database.
+
+    Mutations touch a single row, and the query helpers use the indexes on
+    status, priority, category and due_date so callers can look tasks up
+    without loading the whole table.
+    """
+
+    COLUMNS = ('id', 'title', 'description', 'priority', 'status',
+               'due_date', 'category', 'created_at', 'completed_at')
+    INDEXED_COLUMNS = ('status', 'priority', 'category', 'due_date')
+    # Columns behind the counters returned by counts()
+    COUNTED_COLUMNS = ('status', 'priority', 'due_date')
+
+    def __init__(self, filename="todo_data.db"):
+        self.filename = filename
+        self.conn = sqlite3.connect(filename)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id INTEGER PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    description TEXT NOT NULL DEFAULT '',
+                    priority INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    due_date TEXT,
+                    category TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    completed_at TEXT
+                )
+            """)
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)")
+            for column in self.INDEXED_COLUMNS:
+                self.conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_tasks_{column} ON tasks ({column})")
+
+        placeholders = ", ".join("?" for _ in self.COLUMNS)
+        self._upsert_sql = f"INSERT OR REPLACE INTO tasks ({', '.join(self.COLUMNS)}) VALUES ({placeholders})"
+        # Read-only connections for loads and searches run from worker threads
+        self._owner_thread = threading.get_ident()
+        self._local = threading.local()
+        self._readers = []
+        self._readers_lock = threading.Lock()
+        # Counters for counts(), read from SQL on first use; overdue counts the
+        # open tasks due before _overdue_before, which is None until then
+        self._counted = [self.COLUMNS.index(column) for column in self.COUNTED_COLUMNS]
+        self._overdue_before = None
+
+    def _reader(self):
+        """Connection usable from the calling thread."""
+        if threading.get_ident() == self._owner_thread:
+            return self.conn
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.filename, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    def _row(self, task):
+        data = task.to_dict()
+        return tuple(data[column] for column in self.COLUMNS)
+
+    def load(self):
+        rows = self.conn.execute("SELECT * FROM tasks ORDER BY id")
+        return [dict(row) for row in rows], self.get_next_id()
+
+    def iter_load(self):
+        # May run on a loader thread
+        for row in self._reader().execute("SELECT * FROM tasks ORDER BY id"):
+            yield dict(row)
+        return self.get_next_id()
+
+    def get_next_id(self):
+        conn = self._reader()
+        row = conn.execute("SELECT value FROM meta WHERE key = 'next_id'").fetchone()
+        if row:
+            return row['value']
+        row = conn.execute("SELECT MAX(id) FROM tasks").fetchone()
+        return (row[0] or 0) + 1
+
+    def _set_next_id(self, next_id):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('next_id', ?)", (next_id,))
+
+    def save(self, tasks, next_id):
+        with self.conn:
+            self.conn.execute("DELETE FROM tasks")
+            self.conn.executemany(self._upsert_sql, (self._row(task) for task in tasks))
+            self._set_next_id(next_id)
+        self._overdue_before = None
+
+    def append(self, op, payload, todo_list):
+        self.append_many([(op, payload)], todo_list)
+
+    def append_many(self, records, todo_list):
+        counting = self._overdue_before is not None
+        # (status, priority, due_date) of rows removed and written, applied
+        # to the counters once the transaction is committed
+        changes = []
+        with self.conn:
+            for op, payload in records:
+                if counting:
+                    old = self.conn.execute(
+                        "SELECT status, priority, due_date FROM tasks WHERE id = ?",
+                        (payload if op == 'delete' else payload.id,)).fetchone()
+                    if old:
+                        changes.append((tuple(old), -1))
+                if op == 'delete':
+                    self.conn.execute("DELETE FROM tasks WHERE id = ?", (payload,))
+                else:
+                    row = self._row(payload)
+                    self.conn.execute(self._upsert_sql, row)
+                    if counting:
+                        changes.append((tuple(row[i] for i in self._counted), 1))
+            self._set_next_id(todo_list.next_id)
+        for counted, sign in changes:
+            self._count(counted, sign)
+
+    def _count(self, counted, sign):
+        status, priority, due_date = counted
+        self._total += sign
+        self._status_counts[status] += sign
+        self._priority_counts[priority] += sign
+        if due_date is not None and due_date < self._overdue_before and status != self._completed_status:
+            self._overdue += sign
+
+    def get(self, task_id):
+        row = self.conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return dict(row) if row else None
+
+    def find(self, column, value):
+        if column not in self.INDEXED_COLUMNS:
+            raise ValueError(f"Column {column!r} is not indexed")
+        rows = self.conn.execute(f"SELECT * FROM tasks WHERE {column} = ? ORDER BY id", (value,))
+        return [dict(row) for row in rows]
+
+    def search(self, query):
+        """Ids of tasks whose title or description contains query.
+
+        Safe to call from any thread; other threads read through their own
+        connection.
+        """
+        pattern = '%' + query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        rows = self._reader().execute(
+            "SELECT id FROM tasks WHERE title LIKE ? ESCAPE '\\' OR description LIKE ? ESCAPE '\\'",
+            (pattern, pattern))
+        return {row[0] for row in rows}
+
+    def find_overdue(self, now, completed_status):
+        rows = self.conn.execute(
+            "SELECT * FROM tasks WHERE due_date IS NOT NULL AND due_date < ? AND status != ? ORDER BY due_date",
+            (now.isoformat(), completed_status))
+        return [dict(row) for row in rows]
+
+    def find_due_between(self, start, end, completed_status):
+        rows = self.conn.execute(
+            "SELECT * FROM tasks WHERE due_date >= ? AND due_date < ? AND status != ? ORDER BY due_date",
+            (start.isoformat(), end.isoformat(), completed_status))
+        return [dict(row) for row in rows]
+
+    def next_due_date(self, after, completed_status):
+        return self.conn.execute(
+            "SELECT MIN(due_date) FROM tasks WHERE due_date >= ? AND status != ?",
+            (after.isoformat(), completed_status)).fetchone()[0]
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    def count_by(self, column):
+        if column not in self.INDEXED_COLUMNS:
+            raise ValueError(f"Column {column!r} is not indexed")
+        rows = self.conn.execute(f"SELECT {column}, COUNT(*) FROM tasks GROUP BY {column}")
+        return {row[0]: row[1] for row in rows}
+
+    def count_overdue(self, now, completed_status):
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM tasks WHERE due_date IS NOT NULL AND due_date < ? AND status != ?",
+            (now.isoformat(), completed_status)).fetchone()[0]
+
+    def counts(self, now, completed_status):
+        """(total, {status: count}, {priority: count}, overdue count).
+
+        The table is only counted on the first call; after that save and
+        append_many keep the counters current, and overdue only looks up
+        the tasks that fell due since the previous call.
+        """
+        if self._overdue_before is None:
+            self._total = self.count()
+            self._status_counts = Counter(self.count_by('status'))
+            self._priority_counts = Counter(self.count_by('priority'))
+            self._overdue = self.count_overdue(now, completed_status)
+            self._completed_status = completed_status
+            self._overdue_before = now.isoformat()
+        elif now.isoformat() > self._overdue_before:
+            self._overdue += self.conn.execute(
+                "SELECT COUNT(*) FROM tasks WHERE due_date >= ? AND due_date < ? AND status != ?",
+                (self._overdue_before, now.isoformat(), completed_status)).fetchone()[0]
+            self._overdue_before = now.isoformat()
+        return self._total, dict(self._status_counts), dict(self._priority_counts), self._overdue
+
+    def close(self):
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+        self.conn.close()
+
+
+class WriteBehindStorage:
+    """Defers writes of another storage to a background thread.
+
+    Mutations are only queued, one record per task (the latest change
+    wins). The saver thread waits ``delay`` seconds so a burst of changes
+    settles, then hands the queue to the wrapped storage's ``append_many``
+    in one call; ``save()`` queues a full snapshot instead. ``close()``
+    writes anything still pending, so call it before the application exits.
+    """
+
+    def __init__(self, storage, delay=0.5):
+        self.storage = storage
+        self.filename = storage.filename
+        self.delay = delay
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._dirty = False
+        self._closed = False
+        # Pending full save, as a callable returning (tasks, next_id)
+        self._snapshot = None
+        # Pending changes since then: task id -> (op, payload)
+        self._records = {}
+        self._todo_list = None
+        self._thread = threading.Thread(target=self._run, name="todo-write-behind", daemon=True)
+        self._thread.start()
+
+    def load(self):
+        return self.storage.load()
+
+    def iter_load(self):
+        return self.storage.iter_load()
+
+    def save(self, tasks, next_id):
+        with self._cond:
+            # The snapshot covers every change queued so far
+            self._snapshot = lambda: (tasks, next_id)
+            self._records = {}
+            self._mark_dirty()
+
+    def append(self, op, payload, todo_list):
+        self.append_many([(op, payload)], todo_list)
+
+    def append_many(self, records, todo_list):
+        with self._cond:
+            self._todo_list = todo_list
+            for op, payload in records:
+                _coalesce(self._records, op, payload)
+            self._mark_dirty()
+
+    def _mark_dirty(self):
+        self._dirty = True
+        self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._dirty or self._closed)
+                if self._closed:
+                    return
+                self._cond.wait_for(lambda: self._closed, timeout=self.delay)
+            self.flush()
+
+    @measure("WriteBehindStorage.flush")
+    def flush(self):
+        """Write pending changes now, on the calling thread.
+
+        If the write fails the changes stay queued for the next attempt.
+        """
+        # Taking the snapshot under the write lock keeps writes in order
+        with self._write_lock:
+            with self._cond:
+                if not self._dirty:
+                    return
+                snapshot, records = self._snapshot, self._records
+                self._snapshot, self._records = None, {}
+                self._dirty = False
+            try:
+                if snapshot is not None:
+                    tasks, next_id = snapshot()
+                    self.storage.save(tasks, next_id)
+                    snapshot = None
+                if records:
+                    self.storage.append_many(list(records.values()), self._todo_list)
+            except Exception as e:
+                print(f"Error saving tasks: {e}")
+                self._requeue(snapshot, records)
+
+    def _requeue(self, snapshot, records):
+        with self._cond:
+            # A snapshot queued since then already covers the failed changes
+            if self._snapshot is None:
+                self._snapshot = snapshot
+                for op, payload in self._records.values():
+                    _coalesce(records, op, payload)
+                self._records = records
+            self._mark_dirty()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self.flush()
+        self.storage.close()
+
+
+def _coalesce(records, op, payload):
+    """Queue a change in records, replacing an earlier one for the same task."""
+    task_id = payload if op == 'delete' else payload.id
+    previous = records.get(task_id)
+    # The task was never written, so it must still be added
+    if op == 'update' and previous is not None and previous[0] == 'add':
+        op = 'add'
+    records[task_id] = (op, payload)
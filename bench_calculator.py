@@ -0,0 +1,62 @@
+"""Compare calc_expression with the eval() path Calculator used before.
+
+For each sample expression, times three ways of evaluating it:
+- eval: replace × and ÷, then eval()
+- cold: calc_expression, parsing every time
+- cached: calc_expression, through the LRU cache of compiled expressions
+The samples have no variables, so they fold to a constant while parsing
+and a cached run only times the lookup; the speedup is therefore cold
+against eval, the cost of a first evaluation. It stays below 1x: the
+parser is Python, eval()'s is C, and the gap grows with the length of
+the expression. Also shows how long the engine takes to reject 9**9**9,
+which eval() would spend minutes computing.
+
+    python bench_calculator.py
+    python bench_calculator.py --number 20000
+"""
+import argparse
+import timeit
+
+from calc_expression import Expression, compile_expression, evaluate, parse
+
+SAMPLES = {
+    "short": "12+34×5",
+    "decimal": "3.75÷1.5-0.25×8",
+    "nested": "((1+2)×(3+4)-(5-6)÷(7+8))×-(9-10)",
+    "chain-50": "+".join(f"{i}×{i + 1}÷{i + 2}" for i in range(1, 51)),
+}
+
+
+def eval_path(text):
+    return eval(text.replace('×', '*').replace('÷', '/'))
+
+
+def cold_path(text):
+    return Expression(text, parse(text)).evaluate()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=5000, help="evaluations per sample")
+    args = parser.parse_args()
+
+    print(f"{'sample':>10} {'eval us':>9} {'cold us':>9} {'cached us':>10} {'speedup':>8}")
+    for name, text in SAMPLES.items():
+        assert str(eval_path(text)) == str(cold_path(text)) == str(evaluate(text))
+        compile_expression(text)
+        timings = [timeit.timeit(lambda: path(text), number=args.number) / args.number * 1e6
+                   for path in (eval_path, cold_path, evaluate)]
+        print(f"{name:>10} {timings[0]:>9.1f} {timings[1]:>9.1f} {timings[2]:>10.2f} "
+              f"{timings[0] / timings[1]:>7.1f}x")
+
+    compile_expression.cache_clear()
+    started = timeit.default_timer()
+    try:
+        evaluate("9**9**9")
+    except OverflowError:
+        pass
+    print(f"\nrejecting 9**9**9 took {(timeit.default_timer() - started) * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Compare the cost of the calculator's number modes on long chains.
+
+Each sample is a chain of a few hundred operators. For every mode in
+calc_expression.MODES, times parsing and evaluating it with an empty
+expression cache (float and Fraction chains are folded to a constant
+while parsing, so a cached repeat would only time the lookup) and shows
+the result, so the cost of each mode can be weighed against what it
+displays. 'auto' shows which representation it settled on.
+
+    python bench_precision.py
+    python bench_precision.py --length 1000 --precision 50
+"""
+import argparse
+import timeit
+
+from calc_engine import format_result
+from calc_expression import MODES, compile_expression, evaluate
+
+
+def samples(length):
+    return {
+        # int stays exact in every mode
+        "integers": "+".join(f"{i}×{i % 7 + 1}" for i in range(1, length)),
+        # Decimal is exact, float is not: the classic 0.1+0.2
+        "money": "+".join(f"{i % 100}.{i % 97:02d}" for i in range(1, length)),
+        # Only Fraction is exact: 1/3, 1/7, ... never terminate
+        "harmonic": "+".join(f"1÷{i}" for i in range(1, length)),
+        # A function makes any exact answer impossible
+        "functions": "+".join(f"sqrt({i})×0.5" for i in range(1, length)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--length", type=int, default=200, help="terms per chain")
+    parser.add_argument("--precision", type=int, default=28, help="significant digits for decimal")
+    parser.add_argument("--number", type=int, default=50, help="evaluations per sample and mode")
+    args = parser.parse_args()
+
+    print(f"{'sample':>10} {'mode':>9} {'us/eval':>9} {'type':>9}  result")
+    for name, text in samples(args.length).items():
+        for mode in MODES:
+            result = evaluate(text, mode, args.precision)
+
+            def cold():
+                compile_expression.cache_clear()
+                evaluate(text, mode, args.precision)
+            seconds = timeit.timeit(cold, number=args.number)
+            shown = format_result(result)
+            if len(shown) > 40:
+                shown = shown[:37] + "..."
+            print(f"{name:>10} {mode:>9} {seconds / args.number * 1e6:>9.1f} "
+                  f"{type(result).__name__:>9}  {shown}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
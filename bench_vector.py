@@ -0,0 +1,72 @@
+"""Compare calc_vector with evaluating an expression once per row.
+
+For each sample expression over the variables x and y, times:
+- loop: the compiled scalar expression from calc_expression, called once
+  per row from a Python loop (over --loop-rows rows, scaled per row)
+- vector: calc_vector over all --rows rows in one call
+and checks that both give the same values.
+
+    python bench_vector.py
+    python bench_vector.py --rows 10000000 --loop-rows 200000
+"""
+import argparse
+import time
+
+from calc_expression import compile_expression
+from calc_vector import compile_vector, np
+
+SAMPLES = {
+    "linear": "x×2+1",
+    "polynomial": "±x**2+3×x-7",
+    "hypot": "sqrt(x×x+y×y)",
+    "ratio": "(x-y)÷(abs(x)+abs(y)+1)×50÷100",
+    "trig": "sin(x)×cos(y)+log(1+abs(x))",
+}
+
+
+def time_loop(text, xs, ys):
+    expression = compile_expression(text)
+    started = time.perf_counter()
+    values = [expression.evaluate({'x': x, 'y': y}) for x, y in zip(xs, ys)]
+    return time.perf_counter() - started, values
+
+
+def time_vector(text, xs, ys, number):
+    expression = compile_vector(text)
+    best = float('inf')
+    for _ in range(number):
+        started = time.perf_counter()
+        values = expression.evaluate({'x': xs, 'y': ys})
+        best = min(best, time.perf_counter() - started)
+    return best, values
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="rows for the vectorized run")
+    parser.add_argument("--loop-rows", type=int, default=100_000, help="rows for the per-row loop")
+    parser.add_argument("--number", type=int, default=5, help="vectorized runs (best is kept)")
+    args = parser.parse_args()
+    if np is None:
+        parser.error("this benchmark needs NumPy (pip install numpy)")
+
+    generator = np.random.default_rng(0)
+    xs = generator.uniform(-100, 100, args.rows)
+    ys = generator.uniform(-100, 100, args.rows)
+    loop_rows = min(args.loop_rows, args.rows)
+    loop_xs = xs[:loop_rows].tolist()
+    loop_ys = ys[:loop_rows].tolist()
+
+    print(f"{args.rows:,} rows, per-row loop over {loop_rows:,}")
+    print(f"{'sample':>11} {'loop ns/row':>12} {'vector ns/row':>14} {'speedup':>8}")
+    for name, text in SAMPLES.items():
+        loop_time, expected = time_loop(text, loop_xs, loop_ys)
+        vector_time, values = time_vector(text, xs, ys, args.number)
+        assert np.allclose(values[:loop_rows], expected, equal_nan=True), name
+        loop_ns = loop_time / loop_rows * 1e9
+        vector_ns = vector_time / args.rows * 1e9
+        print(f"{name:>11} {loop_ns:>12.0f} {vector_ns:>14.2f} {loop_ns / vector_ns:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Evaluate calculator expressions in a worker process.
+
+A slow expression cannot block the caller, and it can be abandoned: a
+thread cannot be interrupted, so cancelling a job (or hitting its timeout)
+terminates the worker process. A fresh one is started for the next job.
+Results come back formatted by calc_engine.compute.
+
+The caller polls; nothing here blocks or uses callbacks, so a Tk window
+can drive it with after().
+"""
+import itertools
+import multiprocessing
+import time
+
+from calc_engine import compute
+from calc_expression import DEFAULT_PRECISION
+
+
+def _serve(connection):
+    """Worker process: answer (job_id, text, percent, mode, precision) requests until None."""
+    while True:
+        request = connection.recv()
+        if request is None:
+            return
+        job_id, text, percent, mode, precision = request
+        try:
+            connection.send((job_id, True, compute(text, percent, mode, precision)))
+        except Exception as e:
+            connection.send((job_id, False, f"{type(e).__name__}: {e}"))
+
+
+class BackgroundEvaluator:
+    """Runs one evaluation at a time in a worker process."""
+
+    def __init__(self, timeout=2.0):
+        self.timeout = timeout
+        self._process = None
+        self._connection = None
+        # (job id, deadline) of the running job
+        self._job = None
+        self._ids = itertools.count(1)
+
+    @property
+    def busy(self):
+        return self._job is not None
+
+    def _start(self):
+        self._connection, child = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(target=_serve, args=(child,), daemon=True)
+        self._process.start()
+        child.close()
+
+    def _stop(self):
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._connection.close()
+            self._process = None
+            self._connection = None
+
+    def submit(self, text, percent=False, mode='float', precision=DEFAULT_PRECISION):
+        """Start evaluating text (divided by 100 when percent is set).
+
+        mode and precision are passed on to compute(). A job that is still
+        running is cancelled first.
+        """
+        self.cancel()
+        if self._process is None:
+            self._start()
+        job_id = next(self._ids)
+        self._connection.send((job_id, text, percent, mode, precision))
+        self._job = (job_id, time.monotonic() + self.timeout)
+
+    def poll(self):
+        """None while the job runs, then (ok, text).
+
+        text is the formatted result, or the error message when ok is False.
+        """
+        if self._job is None:
+            return None
+        job_id, deadline = self._job
+        try:
+            while self._connection.poll():
+                reply_id, ok, text = self._connection.recv()
+                if reply_id == job_id:
+                    self._job = None
+                    return ok, text
+        except (EOFError, OSError):
+            # The worker died, e.g. out of memory
+            self.cancel()
+            return False, "Evaluation failed"
+        if time.monotonic() > deadline:
+            self.cancel()
+            return False, f"Evaluation took longer than {self.timeout:g} s"
+        return None
+
+    def cancel(self):
+        """Abandon the running job, if any, by stopping the worker."""
+        if self._job is not None:
+            self._job = None
+            self._stop()
+
+    def close(self):
+        self._job = None
+        self._stop()
@@ -0,0 +1,119 @@
+"""Evaluate a file of calculator expressions from the command line.
+
+Each input line is one expression in the calculator's own syntax (× ÷,
+a trailing % for the percent key, an optional trailing =). Lines are read
+in chunks and evaluated on a process pool. Results are written in input
+order as soon as each chunk is done: one output line per input line,
+"Error" for lines that fail, with the reason and line number on stderr.
+Only a few chunks are in flight at a time, so memory stays bounded
+whatever the input size. --mode picks the number type, as in
+calc_expression.MODES.
+
+    python calc_batch.py expressions.txt -o results.txt --mode auto
+    generate_expressions | python calc_batch.py --jobs 4
+"""
+import argparse
+import io
+import itertools
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from calc_engine import ERROR, compute
+from calc_expression import DEFAULT_PRECISION, MODES
+
+
+def evaluate_line(line, mode='float', precision=DEFAULT_PRECISION):
+    """(ok, text) for one input line: the display string or the error."""
+    line = line.strip()
+    try:
+        if line.endswith('%'):
+            return True, compute(line[:-1], True, mode, precision)
+        return True, compute(line.rstrip('='), False, mode, precision)
+    except Exception as e:
+        return False, f"{type(e).__name__}: {e}"
+
+
+def evaluate_chunk(lines, mode='float', precision=DEFAULT_PRECISION):
+    return [evaluate_line(line, mode, precision) if line.strip() else (True, "") for line in lines]
+
+
+def chunks(lines, size):
+    lines = iter(lines)
+    while True:
+        chunk = list(itertools.islice(lines, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run(lines, output, errors, jobs, chunk_size, mode='float', precision=DEFAULT_PRECISION):
+    """Evaluate lines into output; returns (expressions, failures)."""
+    count = failures = 0
+
+    def write(results):
+        nonlocal count, failures
+        for ok, text in results:
+            count += 1
+            if ok:
+                output.write(text + "\n")
+            else:
+                failures += 1
+                output.write(ERROR + "\n")
+                errors.write(f"line {count}: {text}\n")
+        output.flush()
+
+    if jobs == 1:
+        for chunk in chunks(lines, chunk_size):
+            write(evaluate_chunk(chunk, mode, precision))
+        return count, failures
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = deque()
+        for chunk in chunks(lines, chunk_size):
+            pending.append(pool.submit(evaluate_chunk, chunk, mode, precision))
+            # Keep every worker busy, but never read far ahead of the output
+            if len(pending) >= 2 * jobs:
+                write(pending.popleft().result())
+        while pending:
+            write(pending.popleft().result())
+    return count, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", nargs="?", default="-", help="expression file, - for stdin")
+    parser.add_argument("-o", "--output", help="result file (default: stdout)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="lines per chunk")
+    parser.add_argument("--mode", choices=MODES, default="float", help="number type")
+    parser.add_argument("--precision", type=int, default=DEFAULT_PRECISION,
+                        help="significant digits in decimal mode")
+    args = parser.parse_args()
+
+    if args.input == "-":
+        source = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8")
+    else:
+        source = open(args.input, encoding="utf-8")
+    if args.output:
+        output = open(args.output, "w", encoding="utf-8")
+    else:
+        output = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8")
+
+    started = time.perf_counter()
+    try:
+        count, failures = run(source, output, sys.stderr, max(args.jobs, 1), args.chunk_size,
+                              args.mode, args.precision)
+    finally:
+        source.close()
+        output.close()
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed else 0
+    print(f"{count} expressions ({failures} errors) in {elapsed:.2f} s: {rate:,.0f} expressions/s",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Calculator logic without the Tk window.
+
+CalculatorEngine holds the input line and the display text and applies
+button presses to them exactly as the Tk Calculator does. It can be
+driven from tests, batch jobs or another front end without a display.
+compute() is the '=' / '%' evaluation on its own. While typing, preview is
+the running result, updated incrementally on every key.
+"""
+from decimal import Decimal
+from fractions import Fraction
+
+from calc_expression import DEFAULT_PRECISION, IncrementalEvaluator, evaluate
+
+ERROR = "Error"
+
+# Longer results are reported as errors rather than shown
+MAX_RESULT_CHARS = 1000
+
+DIGITS = frozenset('0123456789.')
+OPERATORS = frozenset('+-×÷')
+
+
+def format_result(value):
+    """Display string for a number of any calc_expression mode.
+
+    Decimals are shown without exponent or trailing zeros, fractions as a
+    decimal when that is exact and as n/d otherwise.
+    """
+    if isinstance(value, Decimal):
+        if value.is_zero():
+            return "0"
+        if not value.is_finite() or abs(value.adjusted()) > MAX_RESULT_CHARS:
+            return str(value)
+        shown = format(value, 'f')
+        return shown.rstrip('0').rstrip('.') if '.' in shown else shown
+    if isinstance(value, Fraction):
+        if value.denominator == 1:
+            return str(value.numerator)
+        # n/d has a finite decimal expansion when d is made of 2s and 5s
+        rest = value.denominator
+        twos = (rest & -rest).bit_length() - 1
+        rest >>= twos
+        fives = 0
+        while rest % 5 == 0:
+            rest //= 5
+            fives += 1
+        if rest != 1:
+            return f"{value.numerator}/{value.denominator}"
+        places = max(twos, fives)
+        whole, part = divmod(abs(value.numerator) * 10 ** places // value.denominator, 10 ** places)
+        return f"{'-' if value < 0 else ''}{whole}.{part:0{places}d}"
+    return str(value)
+
+
+def compute(text, percent=False, mode='float', precision=DEFAULT_PRECISION):
+    """Display string for text, as '=' (or '%' with percent) shows it.
+
+    mode and precision select the number type, see calc_expression.MODES.
+    Raises ExpressionError for invalid input, ArithmeticError for 1/0 or
+    results that are too large.
+    """
+    shown = format_result(evaluate(text, mode, precision, percent))
+    if len(shown) > MAX_RESULT_CHARS:
+        raise OverflowError(f"result longer than {MAX_RESULT_CHARS} characters")
+    return shown
+
+
+class CalculatorEngine:
+    def __init__(self, mode='float', precision=DEFAULT_PRECISION):
+        self.current_input = ""
+        self.display = "0"
+        # Number mode for '=' and '%', see calc_expression.MODES
+        self.mode = mode
+        self.precision = precision
+        self._live = IncrementalEvaluator(mode, precision)
+
+    def press(self, key):
+        """Apply one button and return the new display text.
+
+        '=' and '%' are evaluated right away; a front end that evaluates
+        elsewhere calls apply_result with the outcome instead.
+        """
+        if key == 'C':
+            self.clear()
+        elif key in ('=', '%'):
+            try:
+                self.apply_result(True, compute(self.current_input, key == '%', self.mode, self.precision))
+            except Exception:
+                self.apply_result(False, None)
+        elif key == '±':
+            self.toggle_sign()
+        else:
+            self.append(key)
+        return self.display
+
+    @property
+    def preview(self):
+        """Running result of current_input, or "" when it would only repeat it."""
+        live = self._live
+        if (live.mode, live.precision) != (self.mode, self.precision):
+            self._restart()
+            live = self._live
+        value = live.value()
+        if value is None:
+            return ""
+        try:
+            shown = format_result(value)
+        except ValueError:
+            # Too many digits to convert
+            return ""
+        if shown == self.current_input or len(shown) > MAX_RESULT_CHARS:
+            return ""
+        return shown
+
+    def _restart(self):
+        # Re-reads the whole input, for edits that don't append to it
+        self._live = IncrementalEvaluator(self.mode, self.precision)
+        self._live.feed(self.current_input)
+
+    def clear(self):
+        self.current_input = ""
+        self.display = "0"
+        self._live.reset()
+
+    def toggle_sign(self):
+        if self.current_input:
+            if self.current_input[0] == '-':
+                self.current_input = self.current_input[1:]
+            else:
+                self.current_input = '-' + self.current_input
+            self.display = self.current_input
+            self._restart()
+
+    def append(self, key):
+        # A fresh number replaces a lone 0 or the Error message
+        if self.current_input == "0" or self.display == ERROR:
+            self.current_input = ""
+            self._live.reset()
+        self.current_input += key
+        self.display = self.current_input
+        self._live.feed(key)
+
+    def apply_result(self, ok, text):
+        """Show the outcome of evaluating current_input."""
+        if ok:
+            self.display = text
+            self.current_input = text
+        else:
+            self.display = ERROR
+            self.current_input = ""
+        self._restart()
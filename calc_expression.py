@@ -0,0 +1,625 @@
+"""Safe expression engine for the calculator.
+
+Replaces eval() for the calculator grammar: numbers, + - × ÷ (or * /),
+** and // (also typed as ×× and ÷÷) and parentheses, with unary + - and
+±. % is not an operator: the calculator's % key divides the whole
+expression by 100, see parse(). Expressions may also use
+named variables, the constants pi, e and tau, and the functions in
+FUNCTIONS. Text is
+tokenized and parsed by a Pratt parser into a small AST. Constant subtrees
+are folded while parsing. The AST is then compiled to nested closures.
+Compiled expressions are kept in an LRU cache, so a repeated expression is
+only parsed once. IncrementalEvaluator keeps a running value while an
+expression is typed.
+
+By default results follow Python's own arithmetic (int stays int, / is
+true division), so they display exactly as eval() showed them. evaluate()
+can also compute with Decimal or Fraction numbers, or pick the cheapest of
+them that gives an exact result; see MODES. Integer powers whose result
+would be unreasonably large raise OverflowError instead of hanging the
+process; so do products, and sums and quotients of Fractions, whose
+operands are already that large.
+"""
+import contextlib
+import decimal
+import math
+import operator
+import re
+from decimal import Decimal
+from fractions import Fraction
+from functools import lru_cache
+
+
+class ExpressionError(ValueError):
+    """The text is not a valid calculator expression."""
+
+
+# A result with more bits than this could not even be shown (Python refuses
+# to convert ints of more than 4300 digits to str), so don't compute it
+MAX_INT_BITS = 14_000
+
+# Number modes for evaluate():
+# - float: Python int and float, as eval() computes
+# - decimal: Decimal rounded to the given number of significant digits
+# - fraction: exact rationals
+# - auto: int if that is exact, else Decimal if no digit is lost, else
+#   Fraction; float when a function or constant rules out an exact result
+MODES = ('float', 'decimal', 'fraction', 'auto')
+DEFAULT_PRECISION = 28
+
+# One findall() splits the whole text; anything else lands in the last group
+_TOKEN = re.compile(r"""
+    \s*(?:
+        ((?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)   # number
+      | (\*\*|//|××|÷÷|[-+*/×÷()±,])              # operator
+      | ([A-Za-z_]\w*)                             # name
+      | (\S)                                       # anything else
+    )""", re.VERBOSE)
+
+# Display operators mapped to their Python spelling; doubled ones used to
+# reach eval() as ** and //
+_ALIASES = {'×': '*', '÷': '/', '××': '**', '÷÷': '//'}
+
+
+def _power(base, exponent):
+    if isinstance(base, int) and isinstance(exponent, int):
+        size = abs(base) if exponent > 0 else 1
+    elif isinstance(base, Fraction) and isinstance(exponent, Fraction) and exponent.denominator == 1:
+        # Negative powers of fractions are exact too: (1/3)**-5 == 243
+        size = max(abs(base.numerator), base.denominator)
+    else:
+        size = 1
+    if size > 1 and abs(exponent) * math.log2(size) > MAX_INT_BITS:
+        raise OverflowError("result too large")
+    return base ** exponent
+
+
+def _size(value):
+    """Bits in an int, or in the larger part of a Fraction; 0 for other numbers."""
+    # type() rather than isinstance(): Fraction checks go through the ABC
+    # machinery, and this runs for every folded or evaluated operation
+    if type(value) is int:
+        return value.bit_length()
+    if type(value) is Fraction:
+        return max(value.numerator.bit_length(), value.denominator.bit_length())
+    return 0
+
+
+def _bounded(function, fractions_only=False):
+    """function, raising OverflowError when its exact result could pass MAX_INT_BITS.
+
+    Sums of ints grow by a bit at most, so fractions_only skips the check
+    unless a Fraction (whose sums multiply denominators) is involved.
+    """
+    def bounded(left, right):
+        if ((not fractions_only or type(left) is Fraction or type(right) is Fraction)
+                and _size(left) + _size(right) > MAX_INT_BITS):
+            raise OverflowError("result too large")
+        return function(left, right)
+    return bounded
+
+
+def _floordiv(left, right):
+    quotient = left // right
+    # Decimal rounds // towards zero; the other types round down
+    if type(quotient) is Decimal and (left < 0) != (right < 0) and quotient * right != left:
+        return quotient - 1
+    return quotient
+
+
+# operator -> (left binding power, right binding power, function)
+_BINARY = {
+    '+': (10, 11, _bounded(operator.add, fractions_only=True)),
+    '-': (10, 11, _bounded(operator.sub, fractions_only=True)),
+    '*': (20, 21, _bounded(operator.mul)),
+    '/': (20, 21, _bounded(operator.truediv, fractions_only=True)),
+    '//': (20, 21, _floordiv),
+    # Right-associative and binds tighter than unary minus: -2**2 == -4
+    '**': (31, 30, _power),
+}
+_UNARY = {'-': operator.neg, '+': operator.pos}
+_UNARY_BINDING = 25
+
+CONSTANTS = {'pi': math.pi, 'e': math.e, 'tau': math.tau}
+
+# name -> (number of arguments, scalar function, NumPy ufunc name)
+FUNCTIONS = {
+    'sqrt': (1, math.sqrt, 'sqrt'),
+    'exp': (1, math.exp, 'exp'),
+    'log': (1, math.log, 'log'),
+    'log10': (1, math.log10, 'log10'),
+    'log2': (1, math.log2, 'log2'),
+    'sin': (1, math.sin, 'sin'),
+    'cos': (1, math.cos, 'cos'),
+    'tan': (1, math.tan, 'tan'),
+    'asin': (1, math.asin, 'arcsin'),
+    'acos': (1, math.acos, 'arccos'),
+    'atan': (1, math.atan, 'arctan'),
+    'sinh': (1, math.sinh, 'sinh'),
+    'cosh': (1, math.cosh, 'cosh'),
+    'tanh': (1, math.tanh, 'tanh'),
+    'radians': (1, math.radians, 'radians'),
+    'degrees': (1, math.degrees, 'degrees'),
+    'abs': (1, abs, 'absolute'),
+    'floor': (1, math.floor, 'floor'),
+    'ceil': (1, math.ceil, 'ceil'),
+    'trunc': (1, math.trunc, 'trunc'),
+    'atan2': (2, math.atan2, 'arctan2'),
+    'hypot': (2, math.hypot, 'hypot'),
+}
+
+
+def _number(literal, number_type=None):
+    """Value of a number literal: int or float, or number_type if given."""
+    if number_type is None:
+        return int(literal) if literal.isdigit() else float(literal)
+    if number_type is Fraction:
+        # Fraction('1e20000000') would build a 20-million-digit integer
+        mantissa, _, exponent = literal.lower().partition('e')
+        if (len(mantissa) + abs(int(exponent or 0))) * math.log2(10) > MAX_INT_BITS:
+            raise OverflowError("number too large")
+    return number_type(literal)
+
+
+def tokenize(text, number_type=None):
+    """List of (kind, value) tokens; kind is 'number', 'op' or 'name'.
+
+    Numbers are int or float, or number_type (Decimal, Fraction) if given.
+    """
+    tokens = []
+    for number, op, name, other in _TOKEN.findall(text):
+        if number:
+            tokens.append(('number', _number(number, number_type)))
+        elif op:
+            tokens.append(('op', _ALIASES.get(op, op)))
+        elif name:
+            tokens.append(('name', name))
+        elif other:
+            raise ExpressionError(f"Unexpected character {other!r}")
+    return tokens
+
+
+class Node:
+    __slots__ = ()
+
+
+class Number(Node):
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def compile(self):
+        value = self.value
+        return lambda env: value
+
+    def __repr__(self):
+        return f"Number({self.value!r})"
+
+
+class Name(Node):
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def compile(self):
+        name = self.name
+
+        def load(env):
+            try:
+                return env[name]
+            except (KeyError, TypeError):
+                raise ExpressionError(f"Unknown name {name!r}") from None
+        return load
+
+    def __repr__(self):
+        return f"Name({self.name!r})"
+
+
+class Unary(Node):
+    __slots__ = ('op', 'operand')
+
+    def __init__(self, op, operand):
+        self.op = op
+        self.operand = operand
+
+    def compile(self):
+        operand = self.operand.compile()
+        if self.op == '-':
+            return lambda env: -operand(env)
+        return lambda env: +operand(env)
+
+    def __repr__(self):
+        return f"Unary({self.op!r}, {self.operand!r})"
+
+
+class Binary(Node):
+    __slots__ = ('op', 'left', 'right')
+
+    def __init__(self, op, left, right):
+        self.op = op
+        self.left = left
+        self.right = right
+
+    def compile(self):
+        left = self.left.compile()
+        right = self.right.compile()
+        function = _BINARY[self.op][2]
+        return lambda env: function(left(env), right(env))
+
+    def __repr__(self):
+        return f"Binary({self.op!r}, {self.left!r}, {self.right!r})"
+
+
+class Call(Node):
+    __slots__ = ('function', 'args', 'number_type')
+
+    def __init__(self, function, args, number_type=None):
+        self.function = function
+        self.args = args
+        self.number_type = number_type
+
+    def implementation(self):
+        """The function, returning number_type instead of float if one is set."""
+        function = FUNCTIONS[self.function][1]
+        number_type = self.number_type
+        if number_type is None:
+            return function
+
+        def call(*args):
+            result = function(*args)
+            return number_type(repr(result)) if type(result) is float else result
+        return call
+
+    def compile(self):
+        function = self.implementation()
+        args = [arg.compile() for arg in self.args]
+        if len(args) == 1:
+            arg, = args
+            return lambda env: function(arg(env))
+        return lambda env: function(*[arg(env) for arg in args])
+
+    def __repr__(self):
+        return f"Call({self.function!r}, {self.args!r})"
+
+
+def variables(node):
+    """Set of the variable names node refers to."""
+    if type(node) is Name:
+        return {node.name}
+    if type(node) is Unary:
+        return variables(node.operand)
+    if type(node) is Binary:
+        return variables(node.left) | variables(node.right)
+    if type(node) is Call:
+        return set().union(*map(variables, node.args))
+    return set()
+
+
+def _fold(node):
+    """Replace node by its value when all of its operands are numbers.
+
+    Arithmetic and domain errors (1/0, overflow, sqrt(-1)) are left in the
+    tree, so they are raised when the expression is evaluated rather than
+    when it is parsed.
+    """
+    try:
+        if type(node) is Binary:
+            if type(node.left) is Number and type(node.right) is Number:
+                return Number(_BINARY[node.op][2](node.left.value, node.right.value))
+        elif type(node) is Unary:
+            if type(node.operand) is Number:
+                return Number(_UNARY[node.op](node.operand.value))
+        elif all(type(arg) is Number for arg in node.args):
+            return Number(node.implementation()(*[arg.value for arg in node.args]))
+    except (ArithmeticError, ValueError):
+        pass
+    return node
+
+
+def _keep(node):
+    return node
+
+
+_END = ('end', None)
+
+
+class _Parser:
+    def __init__(self, text, number_type=None):
+        self.tokens = tokenize(text, number_type)
+        self.tokens.append(_END)
+        self.index = 0
+        self.number_type = number_type
+        # Decimal results depend on the context they are computed in, so
+        # they are left to evaluation time
+        self.fold = _keep if number_type is Decimal else _fold
+        # Set when a function or constant makes the result inexact
+        self.approximate = False
+
+    def advance(self):
+        token = self.tokens[self.index]
+        if token is _END:
+            raise ExpressionError("Unexpected end of expression")
+        self.index += 1
+        return token
+
+    def parse(self, percent=False):
+        if len(self.tokens) == 1:
+            raise ExpressionError("Empty expression")
+        node = self.expression(0)
+        token = self.tokens[self.index]
+        if token is not _END:
+            raise ExpressionError(f"Unexpected {token[1]!r}")
+        if percent:
+            hundred = 100 if self.number_type is None else self.number_type(100)
+            node = self.fold(Binary('/', node, Number(hundred)))
+        return node
+
+    def expression(self, min_binding):
+        tokens = self.tokens
+        kind, value = tokens[self.index]
+        # Most operands are plain numbers; they skip prefix()
+        if kind == 'number':
+            self.index += 1
+            node = Number(value)
+        else:
+            node = self.prefix()
+        while True:
+            op = tokens[self.index][1]
+            binary = _BINARY.get(op)
+            if binary is None or binary[0] < min_binding:
+                return node
+            self.index += 1
+            node = self.fold(Binary(op, node, self.expression(binary[1])))
+
+    def prefix(self):
+        kind, value = self.advance()
+        if kind == 'number':
+            return Number(value)
+        if kind == 'name':
+            return self.name(value)
+        if value == '±':
+            value = '-'
+        if value in _UNARY:
+            return self.fold(Unary(value, self.expression(_UNARY_BINDING)))
+        if value == '(':
+            node = self.expression(0)
+            if self.advance()[1] != ')':
+                raise ExpressionError("Missing ')'")
+            return node
+        raise ExpressionError(f"Unexpected {value!r}")
+
+    def name(self, name):
+        if self.tokens[self.index][1] != '(':
+            if name in CONSTANTS:
+                self.approximate = True
+                value = CONSTANTS[name]
+                return Number(value if self.number_type is None else self.number_type(repr(value)))
+            return Name(name)
+        if name not in FUNCTIONS:
+            raise ExpressionError(f"Unknown function {name!r}")
+        self.approximate = True
+        self.index += 1
+        args = [self.expression(0)]
+        while self.tokens[self.index][1] == ',':
+            self.index += 1
+            args.append(self.expression(0))
+        if self.advance()[1] != ')':
+            raise ExpressionError("Missing ')'")
+        arity = FUNCTIONS[name][0]
+        if len(args) != arity:
+            raise ExpressionError(f"{name}() takes {arity} argument{'s' if arity > 1 else ''}")
+        return self.fold(Call(name, args, self.number_type))
+
+
+def parse(text, number_type=None, percent=False):
+    """AST for text, with constant subtrees folded.
+
+    With percent, the whole expression is divided by 100, as the
+    calculator's % key does. The division is part of the tree, so it is
+    exact in the exact modes.
+    """
+    return _Parser(text, number_type).parse(percent)
+
+
+class Expression:
+    """A parsed and compiled expression, ready to evaluate repeatedly.
+
+    approximate is set when the expression uses functions or constants, so
+    no number mode can give an exact result.
+    """
+
+    __slots__ = ('text', 'ast', 'variables', 'approximate', '_code')
+
+    def __init__(self, text, ast, approximate=False):
+        self.text = text
+        self.ast = ast
+        self.variables = frozenset(variables(ast))
+        self.approximate = approximate
+        self._code = ast.compile()
+
+    def evaluate(self, env=None):
+        """Value of the expression; env maps variable names to values."""
+        return self._code(env)
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(text, number_type=None, percent=False):
+    """Cached Expression for text; raises ExpressionError if it is invalid.
+
+    With number_type (Decimal, Fraction), numbers are parsed as that type.
+    Decimal expressions are evaluated in the caller's decimal context.
+    percent is as for parse().
+    """
+    parser = _Parser(text, number_type)
+    return Expression(text, parser.parse(percent), parser.approximate)
+
+
+def _exact_context(precision):
+    return decimal.Context(prec=precision, traps=[
+        decimal.InvalidOperation, decimal.DivisionByZero, decimal.Overflow, decimal.Inexact])
+
+
+def _evaluate_exact(text, precision, percent):
+    # int and float are tried first: they are the cheapest, and ints are exact
+    expression = compile_expression(text, None, percent)
+    try:
+        result = expression.evaluate()
+        if type(result) is int or expression.approximate:
+            return result
+    except OverflowError:
+        pass
+    try:
+        with decimal.localcontext(_exact_context(precision)):
+            return compile_expression(text, Decimal, percent).evaluate()
+    except decimal.Inexact:
+        # Needs more than precision digits, or doesn't terminate (1/3)
+        pass
+    return compile_expression(text, Fraction, percent).evaluate()
+
+
+_NUMBER_CHARS = frozenset('0123456789.')
+
+
+class IncrementalEvaluator:
+    """Running value of an expression typed one character at a time.
+
+    Keeps the operator-precedence parse state instead of the text: the
+    operators still waiting for their right operand, each with its left
+    operand already computed. Operators are reduced as soon as precedence
+    allows, so feeding a character is O(1) amortized, and value() only has
+    to reduce one waiting operator per precedence level (more for chains of
+    ** or unary signs).
+
+    Understands what the calculator buttons type: numbers, + - × ÷ and
+    their doubled forms, and unary signs. Anything else, or an error in a
+    finished part such as 1÷0+, sets failed. In auto mode values are
+    Fractions, which format like the exact result evaluate() picks.
+    """
+
+    def __init__(self, mode='float', precision=DEFAULT_PRECISION):
+        self.mode = mode
+        self.precision = precision
+        self._number_type = {'float': None, 'decimal': Decimal}.get(mode, Fraction)
+        self._context = decimal.Context(prec=precision) if mode == 'decimal' else None
+        self.reset()
+
+    def reset(self):
+        # (left operand, function, right binding power); left is None for unary ops
+        self._stack = []
+        self._operand = None
+        # Text of the number and of the operator being typed; '×' may still
+        # become '××'
+        self._literal = None
+        self._op = None
+        self.failed = False
+
+    def _scope(self):
+        return decimal.localcontext(self._context) if self._context else contextlib.nullcontext()
+
+    def _convert(self, literal):
+        return _number(literal, self._number_type)
+
+    def feed(self, text):
+        """Append text, usually a single key, to the expression."""
+        if self.failed:
+            return
+        try:
+            with self._scope():
+                for char in text:
+                    self._feed(char)
+        except (ArithmeticError, ValueError):
+            self.failed = True
+
+    def _feed(self, char):
+        literal = self._literal
+        if char in _NUMBER_CHARS or literal is not None and (
+                char in 'eE' or char in '+-' and literal[-1] in 'eE'):
+            if literal is not None:
+                self._literal = literal + char
+                return
+            if self._op is not None:
+                self._apply(self._op)
+                self._op = None
+            self._literal = char
+            return
+        if _ALIASES.get(char, char) not in ('+', '-', '*', '/'):
+            raise ExpressionError(f"Unexpected character {char!r}")
+        if literal is not None:
+            self._operand = self._convert(literal)
+            self._literal = None
+        if self._op is not None:
+            if char == self._op and char in '×÷*/':
+                self._op += char
+                return
+            self._apply(self._op)
+        self._op = char
+
+    def _apply(self, text):
+        op = _ALIASES.get(text, text)
+        operand = self._operand
+        if operand is None:
+            if op not in _UNARY:
+                raise ExpressionError(f"Unexpected {op!r}")
+            self._stack.append((None, _UNARY[op], _UNARY_BINDING))
+            return
+        left_binding, right_binding, function = _BINARY[op]
+        stack = self._stack
+        while stack and stack[-1][2] > left_binding:
+            operand = self._reduce(stack.pop(), operand)
+        stack.append((operand, function, right_binding))
+        self._operand = None
+
+    @staticmethod
+    def _reduce(frame, operand):
+        left, function, _ = frame
+        return function(operand) if left is None else function(left, operand)
+
+    def value(self):
+        """Value so far, or None if there is none yet or it fails.
+
+        A number being typed counts as finished; a trailing operator is
+        ignored.
+        """
+        if self.failed:
+            return None
+        try:
+            with self._scope():
+                operand = self._operand
+                if self._literal is not None:
+                    operand = self._convert(self._literal)
+                stack = self._stack
+                end = len(stack)
+                if operand is None:
+                    # Nothing after the last operator: use what comes before it
+                    while end and stack[end - 1][0] is None:
+                        end -= 1
+                    if not end:
+                        return None
+                    end -= 1
+                    operand = stack[end][0]
+                for index in range(end - 1, -1, -1):
+                    operand = self._reduce(stack[index], operand)
+                return operand
+        except (ArithmeticError, ValueError):
+            return None
+
+
+def evaluate(text, mode='float', precision=DEFAULT_PRECISION, percent=False):
+    """Value of text, computed the way eval() would but without running code.
+
+    mode is one of MODES; precision is the number of significant digits
+    for Decimal results. With percent the value is divided by 100, as the
+    % key does.
+    """
+    if mode == 'float':
+        return compile_expression(text, None, percent).evaluate()
+    if mode == 'decimal':
+        with decimal.localcontext(decimal.Context(prec=precision)):
+            return compile_expression(text, Decimal, percent).evaluate()
+    if mode == 'fraction':
+        return compile_expression(text, Fraction, percent).evaluate()
+    if mode == 'auto':
+        return _evaluate_exact(text, precision, percent)
+    raise ValueError(f"Unknown number mode {mode!r}")
@@ -0,0 +1,135 @@
+"""Load generator for calc_server.
+
+Opens --clients connections. Each one sends --requests expressions in
+pipelined batches of --batch lines and waits for a batch's answers before
+sending the next. Expressions are drawn from --distinct random ones, so the
+server's expression cache gets hits. Every answer is checked against
+calc_batch.evaluate_line. Reports throughput, percentiles of the batch
+round-trip time, and the server's own counters.
+
+Without --port or --unix it starts a server in this process on a free
+localhost port, so it runs fully offline (client and server then share
+one CPU).
+
+    python calc_loadgen.py
+    python calc_loadgen.py --unix /tmp/calc.sock --clients 16 --batch 100
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+from calc_batch import evaluate_line
+from calc_expression import DEFAULT_PRECISION, MODES
+from calc_server import CalcServer, percentiles
+
+
+def random_expressions(count, seed):
+    generator = random.Random(seed)
+    expressions = []
+    for _ in range(count):
+        terms = [str(generator.randint(0, 999)) for _ in range(generator.randint(1, 8))]
+        text = "".join(term + generator.choice("+-×÷") for term in terms[:-1]) + terms[-1]
+        if generator.random() < 0.1:
+            text += "%"
+        expressions.append(text)
+    return expressions
+
+
+async def request(connect, line):
+    reader, writer = await connect()
+    writer.write(line.encode() + b"\n")
+    response = (await reader.readline()).decode().rstrip("\n")
+    writer.close()
+    await writer.wait_closed()
+    return response
+
+
+async def run_client(connect, number, args, expressions, expected, latencies):
+    """Send this client's share of the load; returns the number of wrong answers."""
+    generator = random.Random(number)
+    reader, writer = await connect()
+    writer.write(f":mode {args.mode}\n".encode())
+    await reader.readline()
+
+    wrong = 0
+    sent = 0
+    while sent < args.requests:
+        lines = generator.choices(expressions, k=min(args.batch, args.requests - sent))
+        started = time.perf_counter()
+        writer.write("".join(line + "\n" for line in lines).encode())
+        await writer.drain()
+        for line in lines:
+            response = (await reader.readline()).decode().rstrip("\n")
+            wrong += response != expected[line]
+        latencies.append(time.perf_counter() - started)
+        sent += len(lines)
+    writer.close()
+    await writer.wait_closed()
+    return wrong
+
+
+async def run(args):
+    server = listener = None
+    if args.port is None and args.unix is None:
+        server = CalcServer()
+        listener = await server.start("127.0.0.1", 0)
+        args.port = listener.sockets[0].getsockname()[1]
+    if args.unix:
+        def connect():
+            return asyncio.open_unix_connection(args.unix)
+    else:
+        def connect():
+            return asyncio.open_connection(args.host, args.port)
+
+    expressions = random_expressions(args.distinct, args.seed)
+    expected = {}
+    for line in expressions:
+        ok, result = evaluate_line(line, args.mode, DEFAULT_PRECISION)
+        expected[line] = f"ok {result}" if ok else f"error {result}"
+
+    latencies = []
+    started = time.perf_counter()
+    wrong = await asyncio.gather(*[run_client(connect, number, args, expressions, expected, latencies)
+                                   for number in range(args.clients)])
+    elapsed = time.perf_counter() - started
+    stats = json.loads((await request(connect, ":stats"))[3:])
+    if listener is not None:
+        listener.close()
+        await listener.wait_closed()
+        # Let the server see every connection close before the loop ends
+        while server.clients:
+            await asyncio.sleep(0.01)
+
+    total = args.clients * args.requests
+    latency = ", ".join(f"{name} {value * 1e3:.2f} ms" for name, value in percentiles(latencies).items())
+    server_latency = ", ".join(f"{name} {value:g} us" for name, value in stats["latency_us"].items())
+    print(f"{args.clients} clients, batches of {args.batch}: "
+          f"{total:,} requests in {elapsed:.2f} s, {total / elapsed:,.0f} requests/s")
+    print(f"batch round trip: {latency}, max {max(latencies) * 1e3:.2f} ms")
+    print(f"server: {server_latency} per request, cache hits {stats['cache_hit_rate']:.1%}")
+    print(f"wrong answers: {sum(wrong)}")
+    return sum(wrong)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1", help="server address for TCP")
+    parser.add_argument("--port", type=int, help="server port; omit both --port and --unix "
+                                                 "to start a server in this process")
+    parser.add_argument("--unix", metavar="PATH", help="server's Unix socket")
+    parser.add_argument("--clients", type=int, default=8, help="concurrent connections")
+    parser.add_argument("--requests", type=int, default=10_000, help="expressions per client")
+    parser.add_argument("--batch", type=int, default=50, help="expressions sent before waiting")
+    parser.add_argument("--distinct", type=int, default=500, help="different expressions to draw from")
+    parser.add_argument("--mode", choices=MODES, default="float", help="number mode")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the expressions")
+    args = parser.parse_args()
+    if asyncio.run(run(args)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""Serve calculator evaluation on a local socket, without Tk.
+
+The protocol is newline-delimited UTF-8. Each request line is one
+expression, as in calc_batch input (× ÷, a trailing % or =). Each response
+line is "ok <result>" or "error <reason>", in request order. Clients may
+pipeline: send a whole batch of lines without waiting for the answers.
+Every complete line received in one read is answered with one write.
+Lines starting with ':' are commands:
+
+    :mode auto      number mode for this connection (calc_expression.MODES)
+    :stats          the server's counters as one line of JSON
+
+Evaluation runs on the event loop, so its cost is bounded: in every mode,
+number literals and exact results are refused past
+calc_expression.MAX_INT_BITS, expressions longer than MAX_EXPRESSION
+characters are refused, and a long pipelined batch lets other
+connections in every TIME_SLICE seconds. The cache of compiled
+expressions is process-wide, so all clients share it and a popular
+expression is only parsed once. Throughput and latency percentiles are printed every
+--report-interval seconds.
+
+    python calc_server.py --unix /tmp/calc.sock
+    python calc_server.py --port 8765 --mode auto
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import signal
+import stat
+import sys
+import time
+from collections import deque
+
+from calc_batch import evaluate_line
+from calc_expression import DEFAULT_PRECISION, MODES, compile_expression
+
+# Longest request line; a client sending more is disconnected
+MAX_LINE = 64 * 1024
+READ_SIZE = 64 * 1024
+# Longest expression evaluated. With capped operands the worst case (a
+# chain of huge powers) costs 10-15 ms per 1000 characters.
+MAX_EXPRESSION = 1000
+# Seconds of evaluation before a batch yields to the event loop
+TIME_SLICE = 0.01
+
+# Latencies kept for the percentiles
+LATENCY_SAMPLES = 100_000
+
+
+def percentiles(values, fractions=(0.5, 0.9, 0.99)):
+    """{'p50': ..., ...} of values, by nearest rank; 0 for no values."""
+    ordered = sorted(values)
+    result = {}
+    for fraction in fractions:
+        name = f"p{fraction * 100:g}"
+        result[name] = ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0
+    return result
+
+
+class CalcServer:
+    def __init__(self, mode='float', precision=DEFAULT_PRECISION):
+        self.mode = mode
+        self.precision = precision
+        self.clients = 0
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.started = time.monotonic()
+        # Seconds from receiving a request to writing its answer
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+
+    async def start(self, host='127.0.0.1', port=8765, path=None):
+        """Listen on the Unix socket path, or on host:port; returns the asyncio server."""
+        if path is None:
+            return await asyncio.start_server(self.handle, host, port)
+        # A socket left behind by a server that didn't shut down cleanly
+        try:
+            if stat.S_ISSOCK(os.stat(path).st_mode):
+                os.unlink(path)
+        except FileNotFoundError:
+            pass
+        return await asyncio.start_unix_server(self.handle, path)
+
+    async def handle(self, reader, writer):
+        mode = self.mode
+        pending = b""
+        self.clients += 1
+        try:
+            while True:
+                data = await reader.read(READ_SIZE)
+                if not data:
+                    return
+                received = time.perf_counter()
+                lines = (pending + data).split(b"\n")
+                pending = lines.pop()
+                if len(pending) > MAX_LINE:
+                    writer.write(f"error Line longer than {MAX_LINE} bytes\n".encode())
+                    return
+                if not lines:
+                    continue
+
+                responses = []
+                slice_started = received
+                for line in lines:
+                    text = line.decode("utf-8", errors="replace").rstrip("\r")
+                    if text.startswith(":"):
+                        mode, response = self.command(text, mode)
+                    elif len(text) > MAX_EXPRESSION:
+                        response = f"error Expression longer than {MAX_EXPRESSION} characters"
+                        self.errors += 1
+                    else:
+                        ok, result = evaluate_line(text, mode, self.precision)
+                        response = f"ok {result}" if ok else f"error {result}"
+                        self.errors += not ok
+                    responses.append(response)
+                    if time.perf_counter() - slice_started > TIME_SLICE:
+                        await asyncio.sleep(0)
+                        slice_started = time.perf_counter()
+                writer.write(("\n".join(responses) + "\n").encode())
+
+                self.requests += len(lines)
+                self.batches += 1
+                self.latencies.extend([time.perf_counter() - received] * len(lines))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.clients -= 1
+            writer.close()
+
+    def command(self, text, mode):
+        """(mode, response) for a ':' command line."""
+        name, _, argument = text[1:].partition(" ")
+        if name == "mode":
+            if argument not in MODES:
+                return mode, f"error Unknown mode {argument!r}"
+            return argument, f"ok {argument}"
+        if name == "stats":
+            return mode, "ok " + json.dumps(self.stats())
+        return mode, f"error Unknown command {name!r}"
+
+    def stats(self):
+        uptime = time.monotonic() - self.started
+        cache = compile_expression.cache_info()
+        lookups = cache.hits + cache.misses
+        latency = {name: round(value * 1e6, 1) for name, value in percentiles(self.latencies).items()}
+        return {
+            "clients": self.clients,
+            "requests": self.requests,
+            "errors": self.errors,
+            "batches": self.batches,
+            "uptime": round(uptime, 3),
+            "requests_per_second": round(self.requests / uptime if uptime else 0, 1),
+            "latency_us": latency,
+            "cache_hit_rate": round(cache.hits / lookups if lookups else 0, 4),
+            "cache_size": cache.currsize,
+        }
+
+    async def report(self, interval):
+        """Print throughput and latency to stderr every interval seconds."""
+        last = self.requests
+        while True:
+            await asyncio.sleep(interval)
+            stats = self.stats()
+            rate = (self.requests - last) / interval
+            last = self.requests
+            latency = ", ".join(f"{name} {value:g} us" for name, value in stats["latency_us"].items())
+            print(f"{rate:,.0f} requests/s, {stats['clients']} clients, {latency}, "
+                  f"cache hits {stats['cache_hit_rate']:.1%}", file=sys.stderr)
+
+
+async def serve(args):
+    server = CalcServer(args.mode, args.precision)
+    listener = await server.start(args.host, args.port, args.unix)
+    where = args.unix or f"{args.host}:{args.port}"
+    print(f"serving on {where} ({args.mode} mode)", file=sys.stderr)
+    # Shut down through the finally below on kill as well; not on Windows
+    with contextlib.suppress(NotImplementedError):
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    if args.report_interval > 0:
+        reporter = asyncio.ensure_future(server.report(args.report_interval))
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        if args.report_interval > 0:
+            reporter.cancel()
+        if args.unix:
+            os.unlink(args.unix)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1", help="address for TCP")
+    parser.add_argument("--port", type=int, default=8765, help="port for TCP")
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--mode", choices=MODES, default="float", help="default number mode")
+    parser.add_argument("--precision", type=int, default=DEFAULT_PRECISION,
+                        help="significant digits in decimal mode")
+    parser.add_argument("--report-interval", type=float, default=10.0,
+                        help="seconds between reports, 0 for none")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+
+if __name__ == "__main__":
+    main()
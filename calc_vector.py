@@ -0,0 +1,157 @@
+"""Evaluate calculator expressions over whole NumPy arrays.
+
+An expression such as "sqrt(x×x+y×y)÷2" is parsed once by calc_expression
+and compiled into a short program of NumPy ufunc calls, one per operator
+or function. evaluate() then runs that program over arrays with millions
+of rows in one call instead of evaluating the expression once per row.
+
+The program runs BLOCK_SIZE elements at a time, into scratch buffers that
+are allocated once per call and reused by every operator, so intermediate
+results stay in the CPU cache and a long expression doesn't allocate a
+full-size temporary array per operator.
+
+A trailing % divides the whole result by 100, as the calculator's % key
+does. Arithmetic follows NumPy float64 rules: a row where 1÷0 or sqrt(-1) occurs
+gives inf or nan instead of raising.
+
+NumPy is optional; nothing else in the calculator needs it.
+
+    hypot = compile_vector("sqrt(x×x+y×y)")
+    hypot.evaluate({"x": xs, "y": ys})
+"""
+from functools import lru_cache
+
+from calc_expression import FUNCTIONS, Binary, ExpressionError, Name, Number, Unary, parse, variables
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Elements per block; a few blocks of float64 fit in L2 cache
+BLOCK_SIZE = 16384
+
+_BINARY_UFUNCS = {
+    '+': 'add',
+    '-': 'subtract',
+    '*': 'multiply',
+    '/': 'true_divide',
+    '//': 'floor_divide',
+    '**': 'power',
+}
+
+
+def _float(value):
+    try:
+        return float(value)
+    except OverflowError:
+        # Integers folded at parse time may not fit a float64
+        return float('inf') if value > 0 else float('-inf')
+
+
+class VectorExpression:
+    """An expression compiled to NumPy ufunc calls.
+
+    Each step of the program is (ufunc, operands, register). Operands are
+    ('const', number), ('var', name) or ('temp', register), where registers
+    index the scratch buffers.
+    """
+
+    __slots__ = ('text', 'variables', '_program', '_registers', '_result')
+
+    def __init__(self, text, ast):
+        if np is None:
+            raise ImportError("calc_vector needs NumPy (pip install numpy)")
+        self.text = text
+        self.variables = frozenset(variables(ast))
+        self._program = []
+        self._registers = 0
+        self._result = self._emit(ast, [])
+
+    def _emit(self, node, free):
+        """Append the steps computing node; returns the operand holding it."""
+        if type(node) is Number:
+            return ('const', _float(node.value))
+        if type(node) is Name:
+            return ('var', node.name)
+        if type(node) is Unary:
+            if node.op == '+':
+                return self._emit(node.operand, free)
+            ufunc = 'negative'
+            operands = [self._emit(node.operand, free)]
+        elif type(node) is Binary:
+            ufunc = _BINARY_UFUNCS[node.op]
+            operands = [self._emit(node.left, free), self._emit(node.right, free)]
+        else:
+            ufunc = FUNCTIONS[node.function][2]
+            operands = [self._emit(arg, free) for arg in node.args]
+        # Ufuncs work element by element, so the result may overwrite an operand
+        free.extend(value for kind, value in operands if kind == 'temp')
+        if free:
+            register = free.pop()
+        else:
+            register = self._registers
+            self._registers += 1
+        self._program.append((getattr(np, ufunc), operands, register))
+        return ('temp', register)
+
+    def evaluate(self, env=None):
+        """float64 array of results for the arrays (or numbers) in env.
+
+        The variables are broadcast against each other as NumPy does; the
+        result has the broadcast shape.
+        """
+        env = env or {}
+        for name in sorted(self.variables):
+            if name not in env:
+                raise ExpressionError(f"Unknown name {name!r}")
+        arrays = {name: np.asarray(env[name], dtype=np.float64) for name in self.variables}
+        shape = np.broadcast_shapes(*[array.shape for array in arrays.values()])
+        # Blocks are taken along the first axis; a single value is one row
+        rows_shape = shape or (1,)
+        arrays = {name: np.broadcast_to(array, rows_shape) for name, array in arrays.items()}
+        result = np.empty(rows_shape)
+
+        kind, value = self._result
+        if kind == 'const':
+            result.fill(value)
+        elif kind == 'var':
+            result[...] = arrays[value]
+        else:
+            self._run(arrays, result)
+        return result.reshape(shape)
+
+    def _run(self, arrays, result):
+        rows = result.shape[0]
+        if rows == 0:
+            return
+        row_size = result[0].size
+        block = max(1, min(rows, BLOCK_SIZE // max(row_size, 1)))
+        buffers = [np.empty((block,) + result.shape[1:]) for _ in range(self._registers)]
+        program = self._program
+        last = len(program) - 1
+
+        with np.errstate(all='ignore'):
+            for start in range(0, rows, block):
+                stop = min(start + block, rows)
+                inputs = {name: array[start:stop] for name, array in arrays.items()}
+                temps = buffers if stop - start == block else [buffer[:stop - start] for buffer in buffers]
+                for step, (ufunc, operands, register) in enumerate(program):
+                    args = [value if kind == 'const' else inputs[value] if kind == 'var' else temps[value]
+                            for kind, value in operands]
+                    ufunc(*args, out=result[start:stop] if step == last else temps[register])
+
+
+@lru_cache(maxsize=256)
+def compile_vector(text):
+    """Cached VectorExpression for text; raises ExpressionError if it is invalid."""
+    source = text.rstrip()
+    percent = source.endswith('%')
+    if percent:
+        source = source[:-1]
+    return VectorExpression(text, parse(source, percent=percent))
+
+
+def evaluate(text, env=None):
+    """Array of values of text over the arrays in env."""
+    return compile_vector(text).evaluate(env)
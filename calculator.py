@@ -1,6 +1,12 @@
 import tkinter as tk
 from tkinter import font
 import math
+from calc_background import BackgroundEvaluator
+from calc_engine import CalculatorEngine
+from calc_expression import MODES
+
+# How often a running evaluation is checked, in milliseconds
+POLL_INTERVAL = 15
 
 class Calculator:
     def __init__(self):
@@ -10,10 +16,15 @@ class Calculator:
         self.window.resizable(False, False)
         self.window.configure(bg='#2C2C2C')
         
-        # Variabel untuk menyimpan operasi
-        self.current_input = ""
+        # Variabel untuk menyimpan operasi; the logic lives in CalculatorEngine
+        self.engine = CalculatorEngine()
         self.result_var = tk.StringVar()
-        self.result_var.set("0")
+        self.result_var.set(self.engine.display)
+        # Running result while typing
+        self.preview_var = tk.StringVar()
+        
+        # '=' and '%' are evaluated in a worker process, polled with after()
+        self.evaluator = BackgroundEvaluator(timeout=2.0)
         
         self.setup_ui()
         
@@ -21,11 +32,24 @@ class Calculator:
         # Font customization
         display_font = font.Font(family="Arial", size=20, weight="bold")
         button_font = font.Font(family="Arial", size=12, weight="bold")
+        preview_font = font.Font(family="Arial", size=11)
         
         # Display frame
         display_frame = tk.Frame(self.window, bg='#2C2C2C')
         display_frame.pack(pady=20, padx=20, fill='x')
         
+        # Preview label, above the display
+        preview = tk.Label(
+            display_frame,
+            textvariable=self.preview_var,
+            font=preview_font,
+            bg='#1A1A1A',
+            fg='#A6A6A6',
+            anchor='e',
+            padx=20
+        )
+        preview.pack(fill='x')
+        
         # Display label
         display = tk.Label(
             display_frame,
@@ -40,6 +64,20 @@ class Calculator:
         )
         display.pack(fill='x')
         
+        # Number mode: float, whose results the keypad can type back in,
+        # unless another one is picked
+        self.mode_var = tk.StringVar(value=self.engine.mode)
+        mode_menu = tk.OptionMenu(display_frame, self.mode_var, *MODES, command=self.set_mode)
+        mode_menu.config(
+            bg='#2C2C2C',
+            fg='#A6A6A6',
+            activebackground='#404040',
+            activeforeground='#FFFFFF',
+            relief='flat',
+            highlightthickness=0
+        )
+        mode_menu.pack(anchor='e', pady=(5, 0))
+        
         # Button frame
         button_frame = tk.Frame(self.window, bg='#2C2C2C')
         button_frame.pack(pady=10, padx=20, fill='both', expand=True)
@@ -121,47 +159,46 @@ class Calculator:
     
     def button_click(self, value):
         if value == 'C':
-            self.current_input = ""
-            self.result_var.set("0")
-        
-        elif value == '=':
-            try:
-                # Replace display operators with Python operators
-                expression = self.current_input.replace('×', '*').replace('÷', '/')
-                result = eval(expression)
-                self.result_var.set(str(result))
-                self.current_input = str(result)
-            except:
-                self.result_var.set("Error")
-                self.current_input = ""
-        
-        elif value == '±':
-            if self.current_input:
-                if self.current_input[0] == '-':
-                    self.current_input = self.current_input[1:]
-                else:
-                    self.current_input = '-' + self.current_input
-                self.result_var.set(self.current_input)
-        
-        elif value == '%':
-            try:
-                expression = self.current_input.replace('×', '*').replace('÷', '/')
-                result = eval(expression) / 100
-                self.result_var.set(str(result))
-                self.current_input = str(result)
-            except:
-                self.result_var.set("Error")
-                self.current_input = ""
-        
-        else:
-            if self.current_input == "0" or self.result_var.get() == "Error":
-                self.current_input = ""
-            
-            self.current_input += value
-            self.result_var.set(self.current_input)
+            # Also stops an evaluation that is still running
+            self.evaluator.cancel()
+        
+        elif self.evaluator.busy:
+            # Ignore other keys until the result is in
+            return
+        
+        elif value in ('=', '%'):
+            self.start_evaluation(percent=value == '%')
+            return
+        
+        self.result_var.set(self.engine.press(value))
+        self.preview_var.set(self.engine.preview)
+    
+    def set_mode(self, mode):
+        self.engine.mode = mode
+        self.preview_var.set(self.engine.preview)
+    
+    def start_evaluation(self, percent):
+        self.evaluator.submit(self.engine.current_input, percent, self.engine.mode, self.engine.precision)
+        self.result_var.set("computing…")
+        self.window.after(1, self.poll_result)
+    
+    def poll_result(self):
+        outcome = self.evaluator.poll()
+        if outcome is None:
+            # Still running, unless 'C' cancelled it
+            if self.evaluator.busy:
+                self.window.after(POLL_INTERVAL, self.poll_result)
+            return
+        
+        self.engine.apply_result(*outcome)
+        self.result_var.set(self.engine.display)
+        self.preview_var.set(self.engine.preview)
     
     def run(self):
-        self.window.mainloop()
+        try:
+            self.window.mainloop()
+        finally:
+            self.evaluator.close()
 
 if __name__ == "__main__":
     calc = Calculator()
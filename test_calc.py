@@ -0,0 +1,199 @@
+"""Tests for the calculator's expression engine and headless engine.
+
+    python -m unittest test_calc
+"""
+import asyncio
+import time
+import unittest
+from decimal import Decimal
+from fractions import Fraction
+
+from calc_engine import ERROR, CalculatorEngine, compute
+from calc_expression import MAX_INT_BITS, ExpressionError, IncrementalEvaluator, compile_expression, evaluate
+from calc_server import MAX_EXPRESSION, CalcServer
+
+
+class EvaluateTest(unittest.TestCase):
+    def test_matches_eval(self):
+        for text in ("12+34*5", "3.75/1.5-0.25*8", "((1+2)*(3+4)-(5-6)/(7+8))*-(9-10)",
+                     "-2**2", "2**-1", "2**3**2", "7//2", "-7//2", "10/4", "1e3+.5"):
+            with self.subTest(text=text):
+                self.assertEqual(evaluate(text), eval(text))
+
+    def test_display_operators(self):
+        self.assertEqual(evaluate("6×7÷2"), 21.0)
+        self.assertEqual(evaluate("2××10÷÷3"), 341)
+        self.assertEqual(evaluate("±5+1"), -4)
+
+    def test_functions_and_variables(self):
+        self.assertAlmostEqual(evaluate("sqrt(16)+hypot(3,4)"), 9.0)
+        self.assertEqual(compile_expression("x×2+y").evaluate({'x': 4, 'y': 1}), 9)
+        with self.assertRaises(ExpressionError):
+            evaluate("x+1")
+
+    def test_invalid(self):
+        for text in ("", "1+", "(1", "1)", "foo(2)", "2$3", "50%"):
+            with self.subTest(text=text):
+                with self.assertRaises(ExpressionError):
+                    evaluate(text)
+
+    def test_errors_at_evaluation(self):
+        with self.assertRaises(ZeroDivisionError):
+            evaluate("1÷0")
+        with self.assertRaises(ValueError):
+            evaluate("sqrt(0-1)")
+
+    def test_modes(self):
+        self.assertEqual(evaluate("0.1+0.2", "decimal"), Decimal("0.3"))
+        self.assertEqual(evaluate("1÷3", "fraction"), Fraction(1, 3))
+        self.assertEqual(evaluate("1÷3", "decimal", precision=5), Decimal("0.33333"))
+        self.assertEqual(evaluate("-7÷÷2", "decimal"), -4)
+
+    def test_auto_mode(self):
+        self.assertEqual(evaluate("2+3", "auto"), 5)
+        self.assertEqual(evaluate("0.1+0.2", "auto"), Decimal("0.3"))
+        self.assertEqual(evaluate("1÷3", "auto"), Fraction(1, 3))
+        self.assertIsInstance(evaluate("sqrt(2)", "auto"), float)
+
+    def test_size_guard(self):
+        with self.assertRaises(OverflowError):
+            evaluate("9**9**9")
+        # Each power is allowed; their product is not
+        evaluate("9××4000")
+        with self.assertRaises(OverflowError):
+            evaluate("×".join(["9××4000"] * 200))
+        with self.assertRaises(OverflowError):
+            evaluate("+".join(f"1÷(2××{MAX_INT_BITS // 4}+{i})" for i in range(8)), "fraction")
+        # Sums of ints are not limited
+        self.assertEqual(evaluate("2**7001+2**7001"), 2 ** 7002)
+
+    def test_huge_literals(self):
+        # Exact modes would build the whole 10**20000000
+        with self.assertRaises(OverflowError):
+            evaluate("1e20000000", "fraction")
+        for mode in ("fraction", "auto"):
+            with self.subTest(mode=mode):
+                with self.assertRaises(OverflowError):
+                    evaluate("1e3000000+1÷3", mode)
+        self.assertEqual(evaluate("2.5e3", "fraction"), 2500)
+        # Held exactly by Decimal, which auto tries before Fraction
+        self.assertEqual(evaluate("1e20000000", "auto"), Decimal("1e20000000"))
+        self.assertEqual(evaluate("1e20000000", "decimal"), Decimal("1e20000000"))
+
+    def test_percent(self):
+        self.assertEqual(evaluate("50+10", percent=True), 0.6)
+        self.assertEqual(evaluate("1÷3", "fraction", percent=True), Fraction(1, 300))
+        # The text is parsed on its own, not spliced into "(text)÷100"
+        with self.assertRaises(ExpressionError):
+            evaluate("1)+(2", percent=True)
+
+
+class IncrementalEvaluatorTest(unittest.TestCase):
+    def test_matches_evaluate_after_every_key(self):
+        text = "12+3×4-5÷2××2"
+        for mode in ("float", "fraction"):
+            live = IncrementalEvaluator(mode)
+            for end in range(1, len(text) + 1):
+                live.feed(text[end - 1])
+                try:
+                    expected = evaluate(text[:end], mode)
+                except ExpressionError:
+                    continue
+                with self.subTest(mode=mode, text=text[:end]):
+                    self.assertEqual(live.value(), expected)
+
+
+class ComputeTest(unittest.TestCase):
+    def test_format(self):
+        # Float mode shows what eval() showed
+        self.assertEqual(compute("6÷3"), "2.0")
+        self.assertEqual(compute("6÷3", mode="auto"), "2")
+        self.assertEqual(compute("1÷4"), "0.25")
+        self.assertEqual(compute("1÷3", mode="fraction"), "1/3")
+
+    def test_percent(self):
+        self.assertEqual(compute("50+10", percent=True), "0.6")
+        self.assertEqual(compute("7", percent=True, mode="auto"), "0.07")
+
+    def test_result_too_long(self):
+        with self.assertRaises(OverflowError):
+            compute("9××2000")
+
+
+class CalculatorEngineTest(unittest.TestCase):
+    def press(self, engine, keys):
+        for key in keys:
+            display = engine.press(key)
+        return display
+
+    def test_keys(self):
+        engine = CalculatorEngine()
+        self.assertEqual(self.press(engine, "12+3×4="), "24")
+        # The result is the start of the next expression
+        self.assertEqual(self.press(engine, "÷8="), "3.0")
+
+    def test_default_mode_shows_decimals(self):
+        self.assertEqual(self.press(CalculatorEngine(), "1÷4="), "0.25")
+        self.assertEqual(self.press(CalculatorEngine(), "1÷3="), str(1 / 3))
+
+    def test_percent_and_sign(self):
+        engine = CalculatorEngine()
+        self.assertEqual(self.press(engine, "50+10%"), "0.6")
+        engine.clear()
+        self.assertEqual(self.press(engine, "5±"), "-5")
+
+    def test_error(self):
+        engine = CalculatorEngine()
+        self.assertEqual(self.press(engine, "1÷0="), ERROR)
+        # Typing after an error starts over
+        self.assertEqual(self.press(engine, "7"), "7")
+
+    def test_preview(self):
+        engine = CalculatorEngine()
+        self.press(engine, "2+3")
+        self.assertEqual(engine.preview, "5")
+        engine.press("±")
+        self.assertEqual(engine.preview, "1")
+        engine.clear()
+        self.press(engine, "7")
+        self.assertEqual(engine.preview, "")
+
+
+class CalcServerTest(unittest.TestCase):
+    def exchange(self, lines):
+        """Responses to lines sent on one connection, and the seconds taken."""
+        async def run():
+            server = CalcServer()
+            listener = await server.start("127.0.0.1", 0)
+            port = listener.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            started = time.perf_counter()
+            writer.write("".join(line + "\n" for line in lines).encode())
+            responses = [(await reader.readline()).decode().rstrip("\n") for _ in lines]
+            elapsed = time.perf_counter() - started
+            writer.close()
+            await writer.wait_closed()
+            listener.close()
+            await listener.wait_closed()
+            while server.clients:
+                await asyncio.sleep(0.01)
+            return responses, elapsed
+        return asyncio.run(run())
+
+    def test_requests(self):
+        responses, _ = self.exchange(["12+3×4", "50+10%", "1÷0", ":mode fraction", "1÷3"])
+        self.assertEqual(responses[:2], ["ok 24", "ok 0.6"])
+        self.assertTrue(responses[2].startswith("error ZeroDivisionError"))
+        self.assertEqual(responses[3:], ["ok fraction", "ok 1/3"])
+
+    def test_expensive_lines_are_refused_quickly(self):
+        lines = [":mode fraction", "1e20000000", "1e3000000+1÷3", "×".join(["9××4000"] * 100),
+                 "1+" * MAX_EXPRESSION + "1", "1+1"]
+        responses, elapsed = self.exchange(lines)
+        self.assertTrue(all(response.startswith("error") for response in responses[1:-1]), responses)
+        self.assertEqual(responses[-1], "ok 2")
+        self.assertLess(elapsed, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()